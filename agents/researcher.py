@@ -1,16 +1,21 @@
 from crewai import Agent
-from tools.web_searchtool import WebSearchTool
-from utils.llm_config import get_perplexity_llm
+from utils.registry import get_llm, get_search_tool
 
-def create_researcher_agent():
-    return Agent(
-        role='Senior Research Analyst',
-        goal='Gather comprehensive, accurate, and up-to-date information on the given topic',
-        backstory="""You are an expert research analyst with years of experience in gathering 
+# Static agent settings. Agents themselves are built per run (crews mutate them),
+# but they all share the process-wide LLM client and search tool from utils.registry
+RESEARCHER_TEMPLATE = dict(
+    role='Senior Research Analyst',
+    goal='Gather comprehensive, accurate, and up-to-date information on the given topic',
+    backstory="""You are an expert research analyst with years of experience in gathering 
         and synthesizing information from various sources. You have a keen eye for detail 
         and always ensure the information you provide is accurate, relevant, and current.""",
-        tools=[WebSearchTool()],
-        verbose=True,
-        allow_delegation=False,
-        llm=get_perplexity_llm()
-    )
\ No newline at end of file
+    verbose=True,
+    allow_delegation=False
+)
+
+def create_researcher_agent():
+    return Agent(
+        **RESEARCHER_TEMPLATE,
+        tools=[get_search_tool()],
+        llm=get_llm()
+    )
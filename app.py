@@ -1,18 +1,18 @@
 import streamlit as st
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Add the current directory to Python path to import our modules
 sys.path.append(str(Path(__file__).parent))
 
-from crewai import Crew, Process
-from tasks.research_task import create_research_task
-from tasks.organize_task import create_organization_task
-from tasks.generation_task import create_generation_task
-from utils.ppt_formatter import PowerPointFormatter
 from utils.config_loader import Config
-from utils.llm_config import get_perplexity_llm
+from utils.events import JsonlEventWriter, format_event
+from utils.job_runner import JobRunner
+from utils.metrics import format_summary, start_metrics_server
+from utils.pipeline import preload
 
 # Page configuration
 st.set_page_config(
@@ -76,57 +76,75 @@ def validate_config():
         st.info("Please make sure you have set up your PERPLEXITY_API_KEY in the .env file")
         return False
 
-def generate_presentation(topic, filename):
-    """Generate the presentation using CrewAI"""
-    try:
-        # Create tasks
-        with st.status("Creating research task...", expanded=True) as status:
-            research_task = create_research_task(topic)
-            status.update(label="Research task created successfully!", state="complete")
-        
-        with st.status("Creating organization task...", expanded=True) as status:
-            organization_task = create_organization_task(topic, research_task)
-            status.update(label="Organization task created successfully!", state="complete")
-        
-        with st.status("Creating generation task...", expanded=True) as status:
-            generation_task = create_generation_task(topic, organization_task)
-            status.update(label="Generation task created successfully!", state="complete")
-        
-        # Form the crew
-        with st.status("Forming AI crew...", expanded=True) as status:
-            crew = Crew(
-                agents=[
-                    research_task.agent,
-                    organization_task.agent,
-                    generation_task.agent
-                ],
-                tasks=[research_task, organization_task, generation_task],
-                process=Process.sequential,
-                verbose=True,
-                llm=get_perplexity_llm()
-            )
-            status.update(label="AI crew formed successfully!", state="complete")
-        
-        # Execute the crew's work
-        with st.status("Starting research and presentation generation...", expanded=True) as status:
-            status.update(label="Researching topic...", state="running")
-            result = crew.kickoff()
-            status.update(label="Research completed! Generating PowerPoint...", state="running")
-        
-        # Generate PowerPoint
-        with st.status("Creating PowerPoint presentation...", expanded=True) as status:
-            formatter = PowerPointFormatter()
-            formatter.format_content_from_outline(str(result))
-            output_path = formatter.save_presentation(filename)
-            status.update(label="PowerPoint created successfully!", state="complete")
-        
-        return output_path, str(result)
-        
-    except Exception as e:
-        st.error(f"Error during presentation generation: {str(e)}")
-        return None, None
+@st.cache_resource
+def get_job_runner():
+    """Job runner shared by every session of this Streamlit server"""
+    event_log = JsonlEventWriter(Config.EVENTS_LOG) if Config.EVENTS_LOG else None
+    output_dir = "output" if Config.SAVE_WEB_DECKS else None
+    # Warm the LLM stack in the background so the page renders without waiting for crewai
+    threading.Thread(target=preload, name="preload", daemon=True).start()
+    return JobRunner(
+        max_workers=Config.MAX_CONCURRENT_JOBS,
+        event_log=event_log,
+        output_dir=output_dir,
+        result_ttl=Config.JOB_RESULT_TTL,
+        result_cache_size=Config.JOB_RESULT_CACHE_SIZE
+    )
+
+@st.cache_resource
+def get_metrics_server():
+    """Prometheus endpoint shared by every session, if METRICS_PORT is set"""
+    return start_metrics_server(Config.METRICS_PORT) if Config.METRICS_PORT else None
+
+STAGE_LABELS = {
+    "research": "Researching topic...",
+    "organize": "Organizing content into an outline...",
+    "generate": "Generating presentation content...",
+    "render": "Creating PowerPoint presentation..."
+}
+
+def show_job_activity(job):
+    """Recent stage/tool events and the live LLM output of a job"""
+    lines = [line for line in map(format_event, list(job.recent_events)) if line]
+    if lines:
+        st.code("\n".join(lines[-10:]), language=None)
+    if job.output_tail:
+        with st.expander("Live output", expanded=True):
+            st.text(job.output_tail[-1500:])
+
+def show_job_status(job):
+    """Render the status panel for a job, polling until it finishes"""
+    runner = get_job_runner()
+    
+    if job.status == "queued":
+        position = runner.queue_position(job.id)
+        st.info(f"⏳ Waiting for a free worker (position {position} in queue)...")
+        st.progress(0.0)
+    elif job.status == "running":
+        st.info(f"🤖 {STAGE_LABELS.get(job.stage, 'Starting...')}")
+        st.progress(job.progress)
+        if job.shared_with:
+            st.caption("🤝 An identical presentation was already being generated; sharing its result")
+        st.caption(f"Running for {time.time() - job.started_at:.0f}s · {job.events.usage['total_tokens']} tokens used")
+        show_job_activity(job)
+    elif job.status == "failed":
+        st.error(f"Error during presentation generation: {job.error}")
+        return
+    
+    if not job.done:
+        time.sleep(1)
+        st.rerun()
+
+def show_run_metrics(job):
+    """Per-run timing and usage summary for the sidebar"""
+    lines = format_summary(job.events.metrics.summary())
+    if lines:
+        st.header("⏱ Run Metrics")
+        st.markdown("\n".join(f"- {line}" for line in lines))
 
 def main():
+    get_metrics_server()
+    
     # Header
     st.markdown('<h1 class="main-header">🤖 AI Presentation Generator</h1>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">Generate professional PowerPoint presentations using AI agents</p>', unsafe_allow_html=True)
@@ -184,42 +202,40 @@ def main():
             elif not filename.strip():
                 st.error("Please enter a filename for your presentation!")
             else:
-                # Clear previous results
-                if 'output_path' in st.session_state:
-                    del st.session_state['output_path']
-                if 'result_content' in st.session_state:
-                    del st.session_state['result_content']
-                
-                # Generate presentation
-                with st.spinner("AI agents are working on your presentation..."):
-                    output_path, result_content = generate_presentation(topic.strip(), filename.strip())
-                
-                if output_path:
-                    st.session_state['output_path'] = output_path
-                    st.session_state['result_content'] = result_content
+                # Generation runs in the background; this session only keeps the job ID
+                st.session_state['job_id'] = get_job_runner().submit(topic.strip(), filename.strip())
+    
+    job = get_job_runner().get(st.session_state.get('job_id'))
+    if job:
+        with st.sidebar:
+            show_run_metrics(job)
     
     with col2:
         st.header("📊 Status")
         
-        if 'output_path' in st.session_state:
+        if job and job.status == "completed":
             st.success("✅ Presentation Generated!")
+            if job.cached:
+                st.caption("⚡ Served from an identical request completed recently")
             
-            # Download button
-            with open(st.session_state['output_path'], 'rb') as file:
-                st.download_button(
-                    label="📥 Download PowerPoint",
-                    data=file.read(),
-                    file_name=f"{filename}.pptx",
-                    mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                    use_container_width=True
-                )
+            # Download button, served straight from memory
+            st.download_button(
+                label="📥 Download PowerPoint",
+                data=job.deck,
+                file_name=f"{job.filename}.pptx",
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                use_container_width=True
+            )
             
             # Show file info
-            st.info(f"📁 Saved as: {os.path.basename(st.session_state['output_path'])}")
+            if job.output_path:
+                st.info(f"📁 Saved as: {os.path.basename(job.output_path)}")
             
             # Show raw content option
             if st.checkbox("Show generated content"):
-                st.text_area("Generated Content:", st.session_state['result_content'], height=300)
+                st.text_area("Generated Content:", job.result, height=300)
+        elif job:
+            show_job_status(job)
         else:
             st.info("👆 Enter topic and filename, then click 'Generate Presentation' to get started!")
     
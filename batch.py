@@ -0,0 +1,109 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.checkpoint import slugify
+from utils.config_loader import Config
+from utils.events import EventStream, JsonlEventWriter
+from utils.pipeline import generate_outline, preload, render_presentation
+
+REPORT_FIELDS = ["row", "topic", "filename", "status", "seconds", "output_path", "error"]
+
+def load_topics(path):
+    """Read topic/filename rows from a CSV (with a header) or JSONL file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+    
+    topics = []
+    seen = set()
+    for row in rows:
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            continue
+        filename = (row.get("filename") or "").strip() or slugify(topic)
+        # Keep output files from clobbering each other when names repeat
+        base, n = filename, 2
+        while filename in seen:
+            filename = f"{base}_{n}"
+            n += 1
+        seen.add(filename)
+        topics.append({"topic": topic, "filename": filename})
+    return topics
+
+def build_deck(row, index, output_dir, event_log=None):
+    started = time.perf_counter()
+    report = {"row": index, "topic": row["topic"], "filename": row["filename"], "output_path": "", "error": ""}
+    stream = EventStream(run_id=f"row-{index}")
+    if event_log:
+        stream.subscribe(event_log)
+    try:
+        outline = generate_outline(row["topic"], verbose=False, event_stream=stream)
+        report["output_path"] = render_presentation(outline, row["filename"], output_dir, event_stream=stream)
+        report["status"] = "ok"
+    except Exception as e:
+        report["status"] = "failed"
+        report["error"] = str(e)
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    return report
+
+def run_batch(topics, workers=4, output_dir="output", event_log=None):
+    """Generate one deck per topic on a bounded worker pool, yielding reports as they finish"""
+    # Import the LLM stack once up front rather than racing to import it from every worker
+    preload()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(build_deck, row, index, output_dir, event_log)
+            for index, row in enumerate(topics, start=1)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+def write_report(reports, path):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(sorted(reports, key=lambda r: r["row"]))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate many presentations from a CSV/JSONL list of topics")
+    parser.add_argument("input", help="CSV (topic,filename header) or JSONL file of topics")
+    parser.add_argument("--workers", type=int, default=Config.BATCH_WORKERS, help="Number of decks generated concurrently")
+    parser.add_argument("--output-dir", default="output", help="Directory the .pptx files are written to")
+    parser.add_argument("--events-jsonl", metavar="PATH", default=Config.EVENTS_LOG, help="Append every run's progress events to a JSONL file")
+    parser.add_argument("--report", default=None, help="Where to write the per-row status report (CSV)")
+    args = parser.parse_args()
+    
+    Config.validate()
+    
+    topics = load_topics(args.input)
+    if not topics:
+        print("No topics found in input file!")
+        return
+    
+    report_path = args.report or os.path.join(args.output_dir, "batch_report.csv")
+    print(f"Generating {len(topics)} presentations with {args.workers} workers...")
+    
+    started = time.perf_counter()
+    reports = []
+    event_log = JsonlEventWriter(args.events_jsonl) if args.events_jsonl else None
+    for report in run_batch(topics, workers=args.workers, output_dir=args.output_dir, event_log=event_log):
+        reports.append(report)
+        mark = "✅" if report["status"] == "ok" else "❌"
+        print(f"{mark} [{len(reports)}/{len(topics)}] {report['topic']} ({report['seconds']}s) {report['error']}")
+    
+    write_report(reports, report_path)
+    failed = sum(1 for r in reports if r["status"] != "ok")
+    print(f"\nDone in {time.perf_counter() - started:.1f}s: {len(reports) - failed} succeeded, {failed} failed")
+    print(f"📄 Report: {os.path.abspath(report_path)}")
+
+if __name__ == "__main__":
+    main()
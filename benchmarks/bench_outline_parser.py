@@ -0,0 +1,79 @@
+"""Benchmark the outline parser on large generated outlines.
+
+Usage: python benchmarks/bench_outline_parser.py [--slides 500] [--repeat 5]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.outline_parser import parse_outline
+
+
+def make_outline(slides, bullets=6):
+    """Outline mixing the formats LLMs produce: bold headers, -, * and numbered bullets, nesting and notes"""
+    parts = []
+    for n in range(1, slides + 1):
+        parts.append(f"**Slide {n}: Section {n} of the merged multi-topic outline**")
+        for b in range(bullets):
+            marker = ("-", "*", f"{b + 1}.")[b % 3]
+            parts.append(f"{marker} Key point {b} about section {n} with some supporting detail")
+            if b % 2:
+                parts.append(f"    - Nested detail {b} for section {n}")
+        parts.append("Speaker notes: talk through the section and the nested details.")
+        parts.append("")
+    return "\n".join(parts)
+
+
+def legacy_parse(outline):
+    """The previous PowerPointFormatter parser, kept for comparison"""
+    text = re.sub(r"\*\*", "", outline).strip()
+    slides_data = []
+    current_slide_title = None
+    current_points = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if re.match(r"^Slide\s*\d+:", line, re.IGNORECASE):
+            if current_slide_title:
+                slides_data.append({'title': current_slide_title, 'points': current_points})
+            current_slide_title = line.split(":", 1)[1].strip()
+            current_points = []
+        elif line.startswith("-"):
+            point = line.lstrip("-").strip()
+            if point:
+                current_points.append(point)
+    if current_slide_title and current_points:
+        slides_data.append({'title': current_slide_title, 'points': current_points})
+    return slides_data
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'slides':>7} {'lines':>8} {'parser ms':>10} {'legacy ms':>10} {'bullets kept':>13} {'legacy kept':>12}")
+    for slides in args.slides:
+        outline = make_outline(slides)
+        new_time, new_slides = best_of(args.repeat, parse_outline, outline)
+        old_time, old_slides = best_of(args.repeat, legacy_parse, outline)
+        kept = sum(len(s.bullets) for s in new_slides)
+        legacy_kept = sum(len(s["points"]) for s in old_slides)
+        print(f"{slides:>7} {outline.count(chr(10)) + 1:>8} {new_time * 1000:>10.1f} {old_time * 1000:>10.1f} {kept:>13} {legacy_kept:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Benchmark the whole pipeline offline against the stub Perplexity server.
+
+Usage: python benchmarks/bench_pipeline.py [--runs 4] [--concurrency 2] [--latency 0.5] [--pipeline-mode full]
+
+Every LLM and search call is answered from benchmarks/fixtures after
+``--latency`` seconds, so results depend only on this code and the latency
+setting. Each run uses a fresh topic, so no checkpoint or cached search is reused.
+"""
+import argparse
+import atexit
+import itertools
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stub_server import StubPerplexityServer
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+_stub = None
+_run_ids = itertools.count()
+
+
+def isolate(base_url, workdir):
+    """Point the app at the stub and keep its caches and checkpoints out of the working tree.
+
+    Must run before anything from utils is imported, since Config reads the
+    environment at import time.
+    """
+    if "utils.config_loader" in sys.modules:
+        raise RuntimeError("run the pipeline benchmark before importing anything from utils")
+    os.environ.update({
+        "PERPLEXITY_API_KEY": "offline-benchmark",
+        "PERPLEXITY_BASE_URL": base_url,
+        "SEARCH_CACHE_PATH": os.path.join(workdir, "search_cache.sqlite3"),
+        "RUNS_DIR": os.path.join(workdir, "runs"),
+        "LLM_STREAM": "false",
+        # Measure the pipeline itself, not the client-side rate limit
+        "RATE_LIMIT_RPM": os.environ.get("RATE_LIMIT_RPM", "0"),
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true"
+    })
+
+
+def get_stub():
+    """The stub server this process's pipeline talks to, started (and the app isolated) on first use"""
+    global _stub
+    if _stub is None:
+        workdir = tempfile.mkdtemp(prefix="ppt-bench-")
+        atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+        _stub = StubPerplexityServer().start()
+        isolate(_stub.url, workdir)
+    return _stub
+
+
+def run_pipeline(runs=4, concurrency=2, latency=0.5, jitter=0.0, pipeline_mode="full", research_mode="agent", warmup=1):
+    """Run the pipeline ``runs`` times against the stub server and return latency/throughput figures.
+
+    ``warmup`` untimed runs go first so one-off costs (lazy imports, agent
+    and client setup) don't skew the first measurement. Every run gets a
+    topic of its own, so no checkpoint or cached search is reused.
+    """
+    stub = get_stub()
+    stub.latency = latency
+    stub.jitter = jitter
+    from utils.events import EventStream
+    from utils.pipeline import generate_outline, render_deck
+
+    def one_run(_):
+        index = next(_run_ids)
+        stream = EventStream(run_id=f"bench-{index}")
+        started = time.perf_counter()
+        outline = generate_outline(
+            f"Renewable energy outlook, benchmark run {index}", verbose=False,
+            research_mode=research_mode, pipeline_mode=pipeline_mode, resume=False, event_stream=stream
+        )
+        render_deck(outline, event_stream=stream)
+        return time.perf_counter() - started, stream.metrics.summary()
+
+    for _ in range(warmup):
+        one_run(None)
+    stub.reset_counts()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one_run, range(runs)))
+    wall = time.perf_counter() - started
+
+    latencies = [seconds for seconds, _ in results]
+    stages = {}
+    for _, summary in results:
+        for stage, seconds in summary["stage_seconds"].items():
+            stages.setdefault(stage, []).append(seconds)
+    return {
+        "runs": runs,
+        "concurrency": concurrency,
+        "latency": latency,
+        "pipeline_mode": pipeline_mode,
+        "research_mode": research_mode,
+        "wall_seconds": round(wall, 3),
+        "runs_per_minute": round(runs / wall * 60, 2),
+        "p50_seconds": round(statistics.median(latencies), 3),
+        "p95_seconds": round(percentile(latencies, 0.95), 3),
+        "max_seconds": round(max(latencies), 3),
+        "stage_seconds": {stage: round(statistics.mean(values), 3) for stage, values in stages.items()},
+        "api_requests": stub.requests,
+        "unmatched_requests": stub.unmatched,
+        "responses": dict(stub.matched)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the stub waits before every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before measuring")
+    parser.add_argument("--pipeline-mode", choices=["full", "fast"], default="full")
+    parser.add_argument("--research-mode", choices=["agent", "parallel"], default="agent")
+    args = parser.parse_args()
+
+    result = run_pipeline(args.runs, args.concurrency, args.latency, args.jitter, args.pipeline_mode, args.research_mode, args.warmup)
+    print(f"{result['runs']} runs, concurrency {result['concurrency']}, {result['latency']}s stub latency "
+          f"({result['pipeline_mode']} pipeline, {result['research_mode']} research)")
+    print(f"  wall {result['wall_seconds']:.2f}s · {result['runs_per_minute']:.1f} runs/min")
+    print(f"  latency p50 {result['p50_seconds']:.2f}s · p95 {result['p95_seconds']:.2f}s · max {result['max_seconds']:.2f}s")
+    for stage, seconds in result["stage_seconds"].items():
+        print(f"  {stage:>9}: {seconds:.2f}s mean")
+    print(f"  {result['api_requests']} API requests ({result['unmatched_requests']} without a recorded response)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark deck rendering: time and peak memory for large generated decks.
+
+Usage: python benchmarks/bench_render.py [--slides 1000] [--repeat 3]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pptx import Presentation
+from pptx.util import Pt
+
+from utils.ppt_formatter import PowerPointFormatter
+from utils.slide_model import Bullet, Slide
+
+
+def make_slides(count, bullets=6):
+    return [
+        Slide(
+            title=f"Section {n}: rendering benchmark slide",
+            bullets=[Bullet(f"Key point {b} about section {n} with some supporting detail", b % 2) for b in range(bullets)]
+        )
+        for n in range(count)
+    ]
+
+
+def render(slides):
+    out = BytesIO()
+    PowerPointFormatter().render_slides(slides).prs.save(out)
+    return out
+
+
+def legacy_render(slides):
+    """The previous per-property rendering, kept for comparison"""
+    prs = Presentation()
+    for i, data in enumerate(slides):
+        if i == 0:
+            slide = prs.slides.add_slide(prs.slide_layouts[0])
+            title_shape = slide.shapes.title
+            title_shape.text = data.title
+            title_frame = title_shape.text_frame
+            title_frame.clear()
+            title_para = title_frame.add_paragraph()
+            title_para.text = data.title
+            title_para.font.size = Pt(32)
+            continue
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        title_shape = slide.shapes.title
+        title_shape.text = data.title
+        title_frame = title_shape.text_frame
+        title_frame.clear()
+        title_para = title_frame.add_paragraph()
+        title_para.text = data.title
+        title_para.font.size = Pt(24)
+        tf = slide.placeholders[1].text_frame
+        tf.text = ""
+        for bullet in data.bullets:
+            p = tf.add_paragraph()
+            p.text = bullet.text
+            p.level = bullet.level
+            p.space_after = Pt(12)
+            p.font.size = Pt(14)
+    out = BytesIO()
+    prs.save(out)
+    return out
+
+
+ENGINES = {"engine": render, "legacy": legacy_render}
+
+
+def peak_rss(name, count):
+    """Peak resident memory, in bytes, of a fresh process rendering ``count`` slides once.
+
+    Most of the memory is lxml's, which tracemalloc doesn't see, so the
+    render runs in its own process and reports the high-water mark the
+    kernel recorded for it.
+    """
+    result = subprocess.run([sys.executable, __file__, "--peak-rss", name, "--slides", str(count)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)["peak_rss"]
+
+
+def report_peak_rss(name, count):
+    slides = make_slides(count)
+    ENGINES[name](make_slides(1))
+    ENGINES[name](slides)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    print(json.dumps({"peak_rss": peak if sys.platform == "darwin" else peak * 1024}))
+
+
+def measure(name, slides, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = ENGINES[name](slides)
+        timings.append(time.perf_counter() - started)
+    return min(timings), peak_rss(name, len(slides)), len(out.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slides", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--peak-rss", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.peak_rss:
+        report_peak_rss(args.peak_rss, args.slides[0])
+        return
+
+    # Warm the template cache so the first timing isn't dominated by disk reads
+    render(make_slides(1))
+
+    print(f"{'slides':>7} {'engine':>8} {'seconds':>8} {'slides/s':>9} {'peak RSS MiB':>13} {'deck KiB':>9}")
+    for count in args.slides:
+        slides = make_slides(count)
+        for name in ENGINES:
+            seconds, peak, size = measure(name, slides, args.repeat)
+            print(f"{count:>7} {name:>8} {seconds:>8.2f} {count / seconds:>9.0f} {peak / 2**20:>13.1f} {size / 2**10:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
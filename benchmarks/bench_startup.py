@@ -0,0 +1,80 @@
+"""Profile cold-start import cost of the entry points.
+
+Usage: python benchmarks/bench_startup.py [--repeat 3] [--top 8] [--target cli ...]
+
+Each target runs in a fresh interpreter under ``python -X importtime``; the
+report shows the best wall time over ``--repeat`` runs and the top-level
+imports that cost the most.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What each entry point imports before it does any real work
+TARGETS = {
+    "cli": "import main",
+    "web": "import utils.job_runner, utils.metrics, utils.events",
+    "validate": "from utils.config_loader import Config; Config.validate()",
+    "rerender": "import main; import utils.ppt_formatter",
+    "llm-stack": "from utils.pipeline import preload; preload()",
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def profile(code):
+    """Run ``code`` in a fresh interpreter.
+
+    Returns the wall time, the total time spent importing, and the cost of
+    each top-level package (its most expensive import, including everything
+    that import pulled in).
+    """
+    env = dict(os.environ, PERPLEXITY_API_KEY=os.environ.get("PERPLEXITY_API_KEY", "startup-profile"))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    total = 0
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, nested, module = int(match.group(2)), match.group(3), match.group(4)
+        if not nested:
+            total += cumulative
+        package = module.split(".")[0]
+        packages[package] = max(packages.get(package, 0), cumulative)
+    return wall, total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="Most expensive imports shown per target")
+    parser.add_argument("--target", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    args = parser.parse_args()
+
+    baseline = min(profile("pass") for _ in range(args.repeat))
+    print(f"interpreter startup: {baseline[0] * 1000:.0f}ms\n")
+    for name in args.target:
+        wall, total, packages = min(profile(TARGETS[name]) for _ in range(args.repeat))
+        print(f"{name}: {wall * 1000:.0f}ms wall, {total / 1000:.0f}ms importing  ({TARGETS[name]})")
+        costly = sorted((item for item in packages.items() if item[0] not in baseline[2]), key=lambda item: -item[1])
+        for package, micros in costly[:args.top]:
+            print(f"  {micros / 1000:>8.1f}ms  {package}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Run the offline benchmark suite and record the results against the current commit.
+
+Usage: python benchmarks/run_suite.py [--quick] [--latency 0.5] [--history benchmarks/results/history.jsonl]
+
+Times the end-to-end pipeline against the stub Perplexity server, then the
+outline parser and the deck formatter on a corpus of outlines of several
+sizes. Each run is appended to the history file with its commit, and compared
+with the latest earlier entry from a different commit; metrics that got more
+than ``--threshold`` worse are flagged.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from benchmarks.bench_pipeline import run_pipeline
+
+HISTORY = ROOT / "benchmarks" / "results" / "history.jsonl"
+
+# Metrics where a larger number is better; everything else is a duration
+HIGHER_IS_BETTER = ("runs_per_minute",)
+
+
+def git_commit():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit, bool(git("status", "--porcelain", "--untracked-files=no"))
+
+
+def corpus(sizes):
+    """Outlines keyed by name: the recorded generator outline plus generated ones of each size"""
+    from benchmarks.bench_outline_parser import make_outline
+    from benchmarks.stub_server import load_fixtures
+
+    outlines = {}
+    for fixture in load_fixtures():
+        if fixture["name"] in ("generate", "organize-json"):
+            outlines[f"recorded-{fixture['name']}"] = fixture["content"].split("Final Answer:", 1)[-1].strip()
+    for size in sizes:
+        outlines[f"generated-{size}"] = make_outline(size)
+    return outlines
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings), 4)
+
+
+def run_components(outlines, repeat):
+    from utils.ppt_formatter import PowerPointFormatter, parse_slides
+
+    results = {}
+    for name, outline in outlines.items():
+        slides = parse_slides(outline)
+
+        def render():
+            PowerPointFormatter().render_slides(slides).save_to_buffer()
+
+        render()  # warm the template cache
+        results[name] = {
+            "slides": len(slides),
+            "parse_seconds": best_of(lambda: parse_slides(outline), repeat),
+            "render_seconds": best_of(render, repeat)
+        }
+    return results
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(current, previous, threshold):
+    """Lines describing metrics that changed by more than ``threshold`` (a fraction)"""
+    lines = []
+    now, before = flatten(current["results"]), flatten(previous["results"])
+    for key, value in now.items():
+        old = before.get(key)
+        if not old or not key.endswith(("seconds", "runs_per_minute")):
+            continue
+        change = (value - old) / old
+        worse = -change if key.endswith(HIGHER_IS_BETTER) else change
+        if abs(change) >= threshold:
+            mark = "⚠ regression" if worse > 0 else "✓ improvement"
+            lines.append(f"  {mark}: {key} {old} → {value} ({change:+.0%})")
+    return lines
+
+
+def load_history(path):
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Fewer runs and smaller outlines, for a fast sanity check")
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds the stub waits before every response")
+    parser.add_argument("--history", type=Path, default=HISTORY, help="JSONL file results are appended to")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="Compare without appending to the history")
+    args = parser.parse_args()
+
+    runs, sizes, repeat = (2, [10, 100], 2) if args.quick else (6, [10, 100, 1000], 5)
+
+    # The pipeline benchmark has to configure the app before utils is imported
+    print("Running pipeline benchmark...")
+    results = {
+        "pipeline": {
+            mode: run_pipeline(runs=runs, concurrency=2, latency=args.latency, pipeline_mode=mode)
+            for mode in ("full", "fast")
+        }
+    }
+    print("Timing parser and formatter...")
+    results["components"] = run_components(corpus(sizes), repeat)
+
+    commit, dirty = git_commit()
+    entry = {
+        "commit": commit,
+        "dirty": dirty,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": args.quick,
+        "results": results
+    }
+
+    for mode, result in results["pipeline"].items():
+        print(f"pipeline[{mode}]: p50 {result['p50_seconds']:.2f}s, p95 {result['p95_seconds']:.2f}s, "
+              f"{result['runs_per_minute']:.1f} runs/min")
+    for name, result in results["components"].items():
+        print(f"{name:>24}: {result['slides']:>5} slides, parse {result['parse_seconds'] * 1000:.1f}ms, "
+              f"render {result['render_seconds'] * 1000:.1f}ms")
+
+    history = load_history(args.history)
+    previous = next((e for e in reversed(history) if e["commit"] != commit and e.get("quick") == args.quick), None)
+    if previous:
+        print(f"\nCompared with {previous['commit']} ({previous['date']}):")
+        print("\n".join(compare(entry, previous, args.threshold)) or "  no significant changes")
+
+    if not args.no_save:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"\nResults appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
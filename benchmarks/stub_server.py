@@ -0,0 +1,216 @@
+"""Local stand-in for the Perplexity chat completions API that replays recorded responses.
+
+Usage:
+    python benchmarks/stub_server.py [--port 8765] [--latency 0.5] [--jitter 0.1]
+    python benchmarks/stub_server.py --record https://api.perplexity.ai --fixtures my_responses.json
+
+Point the app at it with PERPLEXITY_BASE_URL=http://127.0.0.1:8765. In
+``--record`` mode every request is forwarded upstream and the answer is
+appended to the fixtures file, so real runs can be captured once and
+replayed offline afterwards.
+
+Each fixture answers the first request whose prompt contains all of its
+``match`` strings and none of its ``unless`` strings; ``$name`` placeholders
+in its content are filled from the named groups of its ``capture`` regex.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from string import Template
+
+import requests
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "perplexity_responses.json"
+
+
+def load_fixtures(path=FIXTURES):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def prompt_text(payload):
+    return "\n".join(str(message.get("content", "")) for message in payload.get("messages", []))
+
+
+def match_fixture(fixtures, payload):
+    """First fixture whose ``match`` strings all occur in the prompt and whose ``unless`` strings don't"""
+    prompt = prompt_text(payload)
+    for fixture in fixtures:
+        if all(s in prompt for s in fixture.get("match", [])) and not any(s in prompt for s in fixture.get("unless", [])):
+            return fixture
+    return None
+
+
+def render_content(fixture, payload):
+    """Fixture content with ``$name`` placeholders filled from the ``capture`` regex's named groups"""
+    content = fixture["content"]
+    if fixture.get("capture"):
+        found = re.search(fixture["capture"], prompt_text(payload))
+        if found:
+            content = Template(content).safe_substitute(found.groupdict())
+    return content
+
+
+def completion(payload, fixture):
+    content = render_content(fixture, payload)
+    usage = fixture.get("usage") or {}
+    prompt_tokens = usage.get("prompt_tokens", len(prompt_text(payload)) // 4)
+    completion_tokens = usage.get("completion_tokens", len(content) // 4)
+    return {
+        "id": f"stub-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "sonar"),
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content}
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+class StubPerplexityServer:
+    """Threaded HTTP server answering /chat/completions from fixtures after an artificial delay"""
+
+    def __init__(self, fixtures=None, latency=0.0, jitter=0.0, host="127.0.0.1", port=0, record=None, record_path=None):
+        self.fixtures = load_fixtures() if fixtures is None else fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.record = record.rstrip("/") if record else None
+        self.record_path = record_path
+        self.requests = 0
+        self.unmatched = 0
+        self.matched = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                status, body = stub.respond(payload, self.headers.get("Authorization"))
+                self._send(status, body)
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = 0
+            self.unmatched = 0
+            self.matched.clear()
+
+    def respond(self, payload, authorization=None):
+        with self._lock:
+            self.requests += 1
+        if self.record:
+            return self._forward(payload, authorization)
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        fixture = match_fixture(self.fixtures, payload)
+        if fixture is None:
+            with self._lock:
+                self.unmatched += 1
+            return 500, {"error": {"message": "no recorded response matches this request"}}
+        with self._lock:
+            self.matched[fixture.get("name", "?")] += 1
+        return 200, completion(payload, fixture)
+
+    def _forward(self, payload, authorization):
+        response = requests.post(
+            f"{self.record}/chat/completions",
+            json=payload,
+            headers={"Authorization": authorization or "", "Content-Type": "application/json"},
+            timeout=120
+        )
+        body = response.json()
+        if response.ok:
+            # Key the recording on the last message so replays match the same request
+            last = str(payload["messages"][-1].get("content", ""))
+            fixture = {
+                "name": f"recorded-{len(self.fixtures) + 1}",
+                "match": [last[:200]],
+                "content": body["choices"][0]["message"]["content"],
+                "usage": body.get("usage")
+            }
+            with self._lock:
+                self.fixtures.insert(0, fixture)
+                with open(self.record_path, "w", encoding="utf-8") as f:
+                    json.dump(self.fixtures, f, indent=2)
+        return response.status_code, body
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-perplexity", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to the latency")
+    parser.add_argument("--fixtures", default=str(FIXTURES), help="Recorded responses (JSON list)")
+    parser.add_argument("--record", metavar="UPSTREAM", help="Forward requests to this API and record the answers")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if Path(args.fixtures).exists() else []
+    server = StubPerplexityServer(fixtures, args.latency, args.jitter, port=args.port,
+                                  record=args.record, record_path=args.fixtures)
+    print(f"Stub Perplexity API on {server.url} ({len(fixtures)} recorded responses)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,77 @@
-from crewai import Crew, Process
-from tasks.research_task import create_research_task
-from tasks.organize_task import create_organization_task
-from tasks.generation_task import create_generation_task
-from utils.ppt_formatter import PowerPointFormatter
+from utils.pipeline import PIPELINE_MODES, generate_outline, generate_variants, get_checkpoint, parse_variants, render_presentation, update_presentation
 from utils.config_loader import Config
-from utils.llm_config import get_perplexity_llm
+from utils.events import EventStream, JsonlEventWriter, format_event
+from utils.metrics import format_summary
+from utils.query_dedup import new_query_index, use as use_query_index
+import argparse
 import os
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a PowerPoint presentation with AI agents")
+    parser.add_argument("--from-outline", metavar="PATH", help="Re-render a saved outline (e.g. runs/<run>/generate.md or organize.md) without any LLM calls")
+    parser.add_argument("--filename", help="Filename for the presentation (without extension)")
+    parser.add_argument("--pipeline-mode", choices=PIPELINE_MODES, help="Override PIPELINE_MODE for this run")
+    parser.add_argument("--events-jsonl", metavar="PATH", default=Config.EVENTS_LOG, help="Append progress events to a JSONL file")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints from earlier runs of the same topic")
+    parser.add_argument("--update", action="store_true", help="Update output/<filename>.pptx in place, re-rendering only the slides that changed")
+    parser.add_argument("--variant", action="append", metavar="STRUCTURE[:SLIDES]",
+                        help="Build this deck variant from a single research pass, e.g. --variant executive:3 --variant deep_dive:8; repeatable")
+    args = parser.parse_args()
+    try:
+        args.variants = parse_variants(args.variant or [])
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def print_event(event):
+    line = format_event(event)
+    if line:
+        print(line, flush=True)
+
+def print_variant_event(event):
+    line = format_event(event)
+    if line:
+        # One write per line, so lines from variants running in parallel don't run together
+        print(f"[{event['run_id'].split('-', 1)[1]}] {line}\n", end="", flush=True)
+
+def run_variants(topic, filename, args):
+    subscribers = [print_variant_event]
+    if args.events_jsonl:
+        subscribers.append(JsonlEventWriter(args.events_jsonl))
+    print(f"Researching once, then building {len(args.variants)} variants: {', '.join(args.variants)}")
+    results = generate_variants(topic, args.variants, filename, verbose=False, pipeline_mode=args.pipeline_mode,
+                                resume=not args.no_resume, subscribers=subscribers)
+    print()
+    for name, output_path, error in results:
+        if error:
+            print(f"❌ {name}: {error}")
+        else:
+            print(f"✅ {name}: {os.path.abspath(output_path)}")
+
+def print_summary(stream):
+    print("\n⏱ Run summary:")
+    for line in format_summary(stream.metrics.summary()):
+        print(f"   {line}")
+
 def main():
+    args = parse_args()
+    render = update_presentation if args.update else render_presentation
+    
+    stream = EventStream()
+    stream.subscribe(print_event)
+    if args.events_jsonl:
+        stream.subscribe(JsonlEventWriter(args.events_jsonl))
+    
+    if args.from_outline:
+        with open(args.from_outline, encoding="utf-8") as f:
+            result = f.read()
+        filename = args.filename or "presentation"
+        output_path = render(result, filename, event_stream=stream)
+        print(f"\n✅ Presentation successfully created!")
+        print(f"📁 Location: {os.path.abspath(output_path)}")
+        print_summary(stream)
+        return
+    
     # Validate configuration
     Config.validate()
     
@@ -17,50 +81,46 @@ def main():
         print("Topic cannot be empty!")
         return
     
-    filename = input("Enter a filename for your presentation (without extension): ").strip()
+    filename = args.filename or input("Enter a filename for your presentation (without extension): ").strip()
     if not filename:
         filename = "presentation"
     
     print(f"\nStarting research on: {topic}")
     
-    # Create tasks
-    research_task = create_research_task(topic)
-    organization_task = create_organization_task(topic, research_task)
-    generation_task = create_generation_task(topic, organization_task)
+    checkpoint = get_checkpoint(topic, pipeline_mode=args.pipeline_mode)
+    completed = checkpoint.completed_stages()
+    if completed and not args.no_resume:
+        print(f"Resuming from checkpoint {checkpoint.path} (completed: {', '.join(completed)})")
     
-    # Form the crew
-    crew = Crew(
-        agents=[
-            research_task.agent,
-            organization_task.agent,
-            generation_task.agent
-        ],
-        tasks=[research_task, organization_task, generation_task],
-        process=Process.sequential,
-        verbose=True,
-        llm=get_perplexity_llm() 
-    )
+    if args.variants:
+        run_variants(topic, filename, args)
+        return
     
     # Execute the crew's work
     print("Starting the research and presentation generation process...")
-    result = crew.kickoff()
+    index = new_query_index()
+    with use_query_index(index):
+        result = generate_outline(topic, pipeline_mode=args.pipeline_mode, resume=not args.no_resume, event_stream=stream)
     
     print("\nResearch and organization completed. Generating PowerPoint...")
     
     # Parse the result and generate the PowerPoint
     try:
-        formatter = PowerPointFormatter()
-        formatter.format_content_from_outline(str(result))
-        output_path = formatter.save_presentation(filename)
+        output_path = render(result, filename, event_stream=stream)
         
         print(f"\n✅ Presentation successfully created!")
         print(f"📁 Location: {os.path.abspath(output_path)}")
+        print(f"🧮 Tokens used: {stream.usage['total_tokens']}")
+        stats = index.stats() if index is not None else None
+        if stats and stats["hits"] + stats["joins"]:
+            print(f"🔁 Near-duplicate searches skipped: {stats['hits'] + stats['joins']} ({stats['hit_rate']:.0%} of searches)")
+        print_summary(stream)
     except Exception as e:
         print(f"❌ Error creating PowerPoint: {str(e)}")
-        # Fallback: save the raw content
-        with open(f"output/{filename}_content.txt", "w") as f:
-            f.write(str(result))
-        print(f"Raw content saved to output/{filename}_content.txt")
+        # The outline is already checkpointed, so the deck can be re-rendered without the LLM
+        outline_path = checkpoint.stage_path(checkpoint.completed_stages()[-1])
+        print(f"Outline saved to {outline_path}")
+        print(f"Re-render with: python main.py --from-outline {outline_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import glob
+import os
+import time
+
+from utils.config_loader import Config
+from utils.ppt_formatter import parse_slides
+from utils.render_pool import RenderPool
+
+# Checkpointed stage outputs that hold a renderable outline, most final first
+OUTLINE_STAGES = ["generate", "organize"]
+
+def find_outlines(paths):
+    """Resolve outline files and run directories (runs/<run>/) into (filename, outline path) pairs"""
+    found = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.isdir(path):
+                stage_files = [os.path.join(path, f"{stage}.md") for stage in OUTLINE_STAGES]
+                existing = [f for f in stage_files if os.path.exists(f)]
+                if existing:
+                    found.append((os.path.basename(os.path.normpath(path)), existing[0]))
+            elif os.path.isfile(path):
+                found.append((os.path.splitext(os.path.basename(path))[0], path))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render saved outlines to .pptx on a pool of worker processes, without any LLM calls")
+    parser.add_argument("paths", nargs="+", help="Outline files or run directories, e.g. 'runs/*'")
+    parser.add_argument("--workers", type=int, default=Config.RENDER_WORKERS, help="Worker processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=Config.RENDER_TIMEOUT, help="Seconds allowed per deck")
+    parser.add_argument("--template", default=Config.PPTX_TEMPLATE, help="Template .pptx to render with")
+    parser.add_argument("--output-dir", default="output", help="Directory the .pptx files are written to")
+    args = parser.parse_args()
+    
+    outlines = find_outlines(args.paths)
+    if not outlines:
+        print("No outlines found!")
+        return
+    
+    # Parsing is cheap; only the rendering is shipped to the worker processes
+    jobs = []
+    for filename, path in outlines:
+        with open(path, encoding="utf-8") as f:
+            jobs.append((filename, parse_slides(f.read())))
+    
+    started = time.perf_counter()
+    failed = 0
+    with RenderPool(workers=args.workers, timeout=args.timeout, template_path=args.template) as pool:
+        pool.warm()
+        print(f"Rendering {len(jobs)} decks on {pool.workers} workers...")
+        for filename, output_path, error in pool.render_many(jobs, output_dir=args.output_dir):
+            if error:
+                failed += 1
+                print(f"❌ {filename}: {error}")
+            else:
+                print(f"✅ {output_path}")
+    
+    print(f"\nDone in {time.perf_counter() - started:.1f}s: {len(jobs) - failed} rendered, {failed} failed")
+
+if __name__ == "__main__":
+    main()
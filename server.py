@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.checkpoint import slugify
+from utils.config_loader import Config
+from utils.events import EventStream, JsonlEventWriter
+from utils.job_queue import JOB_FIELDS, JobQueue, LeaseLost, QueueFull
+from utils.metrics import REGISTRY
+from utils.pipeline import (PIPELINE_MODES, RESEARCH_MODES, STAGES, generate_outline, generate_variants, parse_variants,
+                            preload, render_presentation)
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_TOPIC_CHARS = 500
+MAX_VARIANTS = 6
+
+# Seconds between database polls: idle workers looking for jobs, and event streams looking for changes
+POLL_INTERVAL = 1.0
+STREAM_INTERVAL = 0.5
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/events|/download)?$")
+
+# Fields of a job row that are returned to clients
+PUBLIC_FIELDS = [name for name in JOB_FIELDS if name not in ("output_path", "outputs", "worker", "heartbeat_at")]
+
+
+class WorkerPool:
+    """Threads that take jobs off the queue and run the pipeline for each.
+
+    Workers claim jobs from the database rather than from memory, so several
+    server processes sharing one queue file split the work between them.
+    ``wake`` lets a submission in this process start without waiting for the
+    next poll.
+    """
+
+    def __init__(self, queue, workers=2, output_dir="output", event_log=None):
+        self.queue = queue
+        self.workers = workers
+        self.output_dir = output_dir
+        self.event_log = event_log
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, args=(f"{self.name}/{i}",), name=f"api-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _loop(self, worker):
+        while not self._stopping.is_set():
+            job = self.queue.claim(worker)
+            if job is None:
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self.run_job(job)
+
+    def run_job(self, job):
+        job_id, worker = job["id"], job["worker"]
+        stream = EventStream(run_id=job_id)
+        if self.event_log:
+            stream.subscribe(self.event_log)
+
+        # Stages can outlast the lease, so keep it alive while the LLM is busy
+        done = threading.Event()
+        lost = threading.Event()
+
+        def on_stage(stage):
+            # The pipeline can only be stopped between stages; stop it at the first one after the job was taken over
+            if lost.is_set() or not self.queue.update(job_id, worker=worker, stage=stage,
+                                                      progress=STAGES.index(stage) / len(STAGES)):
+                raise LeaseLost(f"Job {job_id} was requeued after its lease expired")
+
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, worker, done, lost), daemon=True)
+        heartbeat.start()
+        try:
+            settings = job["settings"]
+            if settings.get("variants"):
+                self.run_variants(job, on_stage)
+                return
+            outline = generate_outline(
+                job["topic"], verbose=False, on_stage=on_stage, research_mode=settings.get("research_mode"),
+                pipeline_mode=settings.get("pipeline_mode"), event_stream=stream
+            )
+            on_stage("render")
+            # The job ID keeps clients who pick the same filename from overwriting each other
+            path = render_presentation(outline, f"{job['filename']}_{job_id[:8]}", self.output_dir, event_stream=stream)
+            self.queue.update(job_id, worker=worker, status="completed", progress=1.0, output_path=path,
+                              finished_at=time.time())
+        except LeaseLost:
+            # Another worker owns the job now; its outcome is theirs to record
+            pass
+        except Exception as e:
+            self.queue.update(job_id, worker=worker, status="failed", error=str(e), finished_at=time.time())
+        finally:
+            done.set()
+
+    def run_variants(self, job, on_stage):
+        """Research once and build every requested variant; the job fails only if all of them do"""
+        settings = job["settings"]
+        variants = parse_variants(settings["variants"])
+        results = generate_variants(
+            job["topic"], variants, f"{job['filename']}_{job['id'][:8]}", self.output_dir, on_stage=on_stage,
+            research_mode=settings.get("research_mode"), pipeline_mode=settings.get("pipeline_mode"),
+            subscribers=[self.event_log] if self.event_log else ()
+        )
+        outputs = {name: path for name, path, error in results if error is None}
+        errors = "; ".join(f"{name}: {error}" for name, _, error in results if error is not None) or None
+        self.queue.update(job["id"], worker=job["worker"], status="completed" if outputs else "failed",
+                          progress=1.0 if outputs else 0.0, outputs=outputs, error=errors, finished_at=time.time())
+
+    def _heartbeat(self, job_id, worker, done, lost):
+        interval = max(self.queue.lease / 3, 1) if self.queue.lease else None
+        while interval and not done.wait(interval):
+            if not self.queue.heartbeat(job_id, worker):
+                lost.set()
+                return
+
+
+def job_view(queue, job):
+    view = {name: job[name] for name in PUBLIC_FIELDS}
+    view["queue_position"] = queue.queue_position(job["id"]) if job["status"] == "queued" else 0
+    if job["status"] == "completed" and job["outputs"] is not None:
+        view["download_urls"] = {name: f"/jobs/{job['id']}/download?variant={name}" for name in job["outputs"]}
+    elif job["status"] == "completed":
+        view["download_url"] = f"/jobs/{job['id']}/download"
+    return view
+
+
+def parse_submission(body):
+    """Validate a POST /jobs body and return (topic, filename, settings)"""
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    topic = body.get("topic")
+    if not isinstance(topic, str) or not topic.strip():
+        raise ValueError("'topic' is required")
+    topic = topic.strip()
+    if len(topic) > MAX_TOPIC_CHARS:
+        raise ValueError(f"'topic' must be at most {MAX_TOPIC_CHARS} characters")
+    filename = body.get("filename") or topic
+    if not isinstance(filename, str):
+        raise ValueError("'filename' must be a string")
+    settings = {}
+    for name, choices in (("research_mode", RESEARCH_MODES), ("pipeline_mode", PIPELINE_MODES)):
+        value = body.get(name)
+        if value is not None and value not in choices:
+            raise ValueError(f"'{name}' must be one of {choices}")
+        if value is not None:
+            settings[name] = value
+    variants = body.get("variants")
+    if variants is not None:
+        if not isinstance(variants, list) or not variants or not all(isinstance(spec, str) for spec in variants):
+            raise ValueError("'variants' must be a non-empty list of \"structure[:slides]\" strings")
+        if len(variants) > MAX_VARIANTS:
+            raise ValueError(f"At most {MAX_VARIANTS} variants per job")
+        parse_variants(variants)
+        settings["variants"] = variants
+    # Filenames end up on disk, so only a slug of what the client sent is used
+    return topic, slugify(filename), settings
+
+
+def make_handler(queue, pool):
+    class ApiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.split("?")[0] != "/jobs":
+                self.send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.send_json(400, {"error": "Invalid Content-Length"})
+                return
+            if length > MAX_BODY_BYTES:
+                self.send_json(413, {"error": "Request body too large"})
+                return
+            try:
+                topic, filename, settings = parse_submission(json.loads(self.rfile.read(length) or b"null"))
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                self.send_json(400, {"error": str(e)})
+                return
+            try:
+                job_id = queue.enqueue(topic, filename, settings)
+            except QueueFull as e:
+                self.send_json(429, {"error": f"Queue is full: {e}"}, headers={"Retry-After": "30"})
+                return
+            pool.wake()
+            self.send_json(202, job_view(queue, queue.get(job_id)), headers={"Location": f"/jobs/{job_id}"})
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = url.path
+            if path == "/health":
+                self.send_json(200, {"status": "ok", "jobs": queue.counts()})
+                return
+            if path == "/metrics":
+                self.send_body(200, REGISTRY.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+                return
+            match = JOB_PATH.match(path)
+            job = queue.get(match.group(1)) if match else None
+            if job is None:
+                self.send_json(404, {"error": "Not found"})
+            elif match.group(2) == "/events":
+                self.stream_events(job)
+            elif match.group(2) == "/download":
+                self.send_deck(job, parse_qs(url.query).get("variant", [None])[0])
+            else:
+                self.send_json(200, job_view(queue, job))
+
+        def stream_events(self, job):
+            """Server-sent events: one ``status`` event whenever the job changes, until it finishes"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            last = None
+            try:
+                while True:
+                    view = job_view(queue, job)
+                    if view != last:
+                        self.wfile.write(f"event: status\ndata: {json.dumps(view)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                        last = view
+                    if job["status"] in ("completed", "failed"):
+                        return
+                    time.sleep(STREAM_INTERVAL)
+                    job = queue.get(job["id"])
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def send_deck(self, job, variant=None):
+            if job["status"] != "completed":
+                self.send_json(409, {"error": f"Job is {job['status']}", "status": job["status"]})
+                return
+            path, filename = job["output_path"], job["filename"]
+            if job["outputs"] is not None:
+                if variant not in job["outputs"]:
+                    self.send_json(404, {"error": f"Pass ?variant= with one of {sorted(job['outputs'])}"})
+                    return
+                path, filename = job["outputs"][variant], f"{filename}_{variant}"
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                self.send_json(410, {"error": "The deck is no longer on disk"})
+                return
+            with f:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.openxmlformats-officedocument.presentationml.presentation")
+                self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+                self.send_header("Content-Disposition", f'attachment; filename="{filename}.pptx"')
+                self.end_headers()
+                shutil.copyfileobj(f, self.wfile)
+
+        def send_json(self, status, payload, headers=None):
+            self.send_body(status, json.dumps(payload).encode("utf-8"), "application/json", headers)
+
+        def send_body(self, status, body, content_type, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ApiHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve deck generation over HTTP, backed by a persistent job queue")
+    parser.add_argument("--host", default=Config.API_HOST)
+    parser.add_argument("--port", type=int, default=Config.API_PORT)
+    parser.add_argument("--workers", type=int, default=Config.API_WORKERS, help="Decks generated concurrently by this process")
+    parser.add_argument("--max-queued", type=int, default=Config.API_MAX_QUEUED, help="Waiting jobs before submissions get 429 (0: unlimited)")
+    parser.add_argument("--db", default=Config.API_DB_PATH, help="SQLite job queue; processes sharing it share the work")
+    parser.add_argument("--output-dir", default=Config.API_OUTPUT_DIR, help="Directory the .pptx files are written to")
+    parser.add_argument("--events-jsonl", metavar="PATH", default=Config.EVENTS_LOG, help="Append every run's progress events to a JSONL file")
+    args = parser.parse_args()
+
+    Config.validate()
+    queue = JobQueue(args.db, max_queued=args.max_queued, lease=Config.API_LEASE_SECONDS)
+    event_log = JsonlEventWriter(args.events_jsonl) if args.events_jsonl else None
+    pool = WorkerPool(queue, workers=args.workers, output_dir=args.output_dir, event_log=event_log)
+
+    # Import the LLM stack once up front rather than racing to import it from every worker
+    preload()
+    pool.start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(queue, pool))
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {args.workers} workers (queue: {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down; running jobs are requeued once their lease expires")
+    finally:
+        pool.stop()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
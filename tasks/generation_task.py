@@ -1,21 +1,61 @@
 from crewai import Task
 from agents.ppt_generator import create_pptx_generator_agent
 
-def create_generation_task(topic, structured_content):
+def create_generation_task(topic, structured_content, follow_outline=False):
+    """Build the generation task from either the organization Task or a finished outline (str).
+
+    With ``follow_outline`` the generator keeps the outline's own slides
+    instead of the default deck structure, e.g. for a deck variant with its
+    own slide count.
+    """
     generator = create_pptx_generator_agent()
     
+    deck_structure = """- A title slide with an engaging title and subtitle
+        - An overview slide introducing the topic
+        - 3-4 content slides with key points, trends, or arguments
+        - A conclusion slide with takeaways"""
+    if follow_outline:
+        deck_structure = """- Exactly one slide for each slide in the structured content, in the same order
+        - The first slide as the title slide, with an engaging title and subtitle"""
+    
+    outline_section = ""
+    context = [structured_content]
+    if isinstance(structured_content, str):
+        outline_section = f"\n\n        Structured content:\n{structured_content}\n"
+        context = []
+    
     return Task(
         description=f"""Create a PowerPoint presentation on {topic} based on the provided structured content.
         
         Create a professional presentation with:
-        - A title slide with an engaging title and subtitle
-        - An overview slide introducing the topic
-        - 3-4 content slides with key points, trends, or arguments
-        - A conclusion slide with takeaways
+        {deck_structure}
         
         Format each slide with appropriate titles and bullet points.
-        Ensure the presentation is visually appealing and well-organized.""",
+        Ensure the presentation is visually appealing and well-organized.{outline_section}""",
         agent=generator,
-        context=[structured_content],
+        context=context,
         expected_output="A complete PowerPoint presentation saved as a .pptx file with all content properly formatted."
-    )
\ No newline at end of file
+    )
+
+def create_section_generation_task(topic, sections, slide_titles):
+    """Build a task that writes slides for only the given outline sections, one slide per section.
+
+    Used when part of an outline was edited: the rest of the deck is kept,
+    so the generator sees the full list of slide titles for context only.
+    """
+    generator = create_pptx_generator_agent()
+    
+    numbered = "\n\n".join(f"Section {i}:\n{section}" for i, section in enumerate(sections, 1))
+    return Task(
+        description=f"""Write PowerPoint slides on {topic} for the outline sections below. They replace slides in an existing presentation whose other slides stay as they are.
+        
+        The full presentation covers: {"; ".join(slide_titles)}
+        
+        Write exactly one slide per section, in the same order as the sections. Format each as "Slide N: Title" followed by its bullet points and an optional "Notes:" line. Do not add any other slides.
+        
+        Sections:
+{numbered}
+""",
+        agent=generator,
+        expected_output=f'Exactly {len(sections)} slides, each as "Slide N: Title" followed by bullet points.'
+    )
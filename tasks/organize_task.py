@@ -1,20 +1,63 @@
 from crewai import Task
 from agents.content_organizer import create_content_organizer_agent
+from utils.slide_model import OUTLINE_JSON_EXAMPLE
 
-def create_organization_task(topic, research_data):
+# Deck structures the organizer can be asked for, with the default number of main content slides;
+# {slides} is replaced by that number or by the slide count a variant asks for
+STRUCTURES = {
+    "standard": ("""1. Title Slide: Engaging title and subtitle
+        2. Overview/Introduction: Context and importance of the topic
+        3. Key Points/Trends/Arguments: {slides} slides with main content
+        4. Conclusion/Takeaways: Summary and implications""", "3-4"),
+    "executive": ("""1. Title Slide: Engaging title and subtitle
+        2. Executive Summary: The bottom line in at most three bullets
+        3. Key Findings: {slides} slides, each leading with one decision-relevant finding and at most four short bullets
+        4. Recommendations/Next Steps: Concrete actions and what they depend on""", "2-3"),
+    "deep_dive": ("""1. Title Slide: Engaging title and subtitle
+        2. Overview/Introduction: Context, scope and key terms
+        3. Detailed Analysis: {slides} slides covering each aspect in depth, with figures, examples and speaker notes
+        4. Challenges/Open Questions: Risks, limitations and debates
+        5. Conclusion/Takeaways: Summary and implications""", "6-8"),
+}
+
+def create_organization_task(topic, research_data, structured=False, structure="standard", slides=None):
+    """Build the outline task from either the research Task or a finished research report (str).
+
+    With ``structured`` the organizer returns a JSON slide list (see
+    utils.slide_model.DeckOutline) that can be rendered straight to a deck.
+    ``structure`` picks one of STRUCTURES and ``slides`` overrides its number
+    of main content slides.
+    """
     organizer = create_content_organizer_agent()
     
+    research_section = ""
+    context = [research_data]
+    if isinstance(research_data, str):
+        research_section = f"\n\n        Research findings:\n{research_data}\n"
+        context = []
+    
+    template, default_slides = STRUCTURES[structure]
+    outline_structure = template.format(slides=slides or default_slides)
+    
+    format_section = ""
+    expected_output = "A structured outline for a PowerPoint presentation with clear sections and bullet points for each slide."
+    if structured:
+        format_section = f"""
+        
+        Write the final slide text yourself: concise, presentation-ready bullet points (3-6 per slide).
+        Respond with ONLY a JSON object in exactly this shape, with no other text:
+        {OUTLINE_JSON_EXAMPLE}
+        The first slide is the title slide and its first bullet is the subtitle."""
+        expected_output = 'A JSON object with a "slides" list, each slide having a "title", a "bullets" list and optional "notes".'
+    
     return Task(
         description=f"""Organize the research findings about {topic} into a structured presentation outline.
         
         The presentation should follow this structure:
-        1. Title Slide: Engaging title and subtitle
-        2. Overview/Introduction: Context and importance of the topic
-        3. Key Points/Trends/Arguments: 3-4 slides with main content
-        4. Conclusion/Takeaways: Summary and implications
+        {outline_structure}
         
-        Ensure the content flows logically and highlights the most important information.""",
+        Ensure the content flows logically and highlights the most important information.{format_section}{research_section}""",
         agent=organizer,
-        context=[research_data],
-        expected_output="A structured outline for a PowerPoint presentation with clear sections and bullet points for each slide."
-    )
\ No newline at end of file
+        context=context,
+        expected_output=expected_output
+    )
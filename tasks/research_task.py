@@ -1,20 +1,56 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Task
 from agents.researcher import create_researcher_agent
+from utils.registry import get_search_tool
+
+# Independent aspects of a topic, as (report heading, search query template)
+RESEARCH_FACETS = [
+    ("Latest trends and developments", "What are the latest trends and developments in {topic}?"),
+    ("Key facts and statistics", "What are the key facts and statistics about {topic}?"),
+    ("Important stakeholders or influencers", "Who are the most important stakeholders and influencers in {topic}?"),
+    ("Current challenges and opportunities", "What are the current challenges and opportunities in {topic}?"),
+    ("Future projections or forecasts", "What are the future projections and forecasts for {topic}?"),
+]
 
 def create_research_task(topic):
     researcher = create_researcher_agent()
+    facets = "\n        ".join(f"- {heading}" for heading, _ in RESEARCH_FACETS)
     
     return Task(
         description=f"""Conduct comprehensive research on the topic: {topic}
         
         Gather information from reliable sources including:
-        - Latest trends and developments
-        - Key facts and statistics
-        - Important stakeholders or influencers
-        - Current challenges and opportunities
-        - Future projections or forecasts
+        {facets}
         
         Ensure the information is up-to-date, accurate, and comprehensive.""",
         agent=researcher,
         expected_output="A detailed research report with all relevant information about the topic, including sources where appropriate."
-    )
\ No newline at end of file
+    )
+
+def run_parallel_research(topic, max_workers=None):
+    """Research every facet of a topic concurrently and merge the answers into one report.
+
+    Runs one web search per entry in RESEARCH_FACETS instead of letting a single
+    agent work through them one round-trip at a time.
+    """
+    tool = get_search_tool()
+    queries = [template.format(topic=topic) for _, template in RESEARCH_FACETS]
+    
+    with ThreadPoolExecutor(max_workers=max_workers or len(queries)) as executor:
+        # Carry the caller's context (e.g. its event stream) into the worker threads
+        futures = [
+            executor.submit(contextvars.copy_context().run, tool.run, query=query)
+            for query in queries
+        ]
+        answers = [future.result() for future in futures]
+    
+    sections = [
+        f"## {heading}\n\n{answer.strip()}"
+        for (heading, _), answer in zip(RESEARCH_FACETS, answers)
+        if not answer.startswith("Error performing web search")
+    ]
+    if not sections:
+        raise RuntimeError(f"All research searches failed, e.g. {answers[0]}")
+    
+    return f"# Research report: {topic}\n\n" + "\n\n".join(sections)
@@ -0,0 +1,49 @@
+"""The formatter's fast slide path relies on python-pptx internals; these tests
+fail loudly if an upgrade changes them."""
+from io import BytesIO
+
+from pptx import Presentation
+
+from utils.ppt_formatter import PowerPointFormatter
+from utils.slide_model import Bullet
+
+
+def test_repeated_layouts_reopen_intact():
+    formatter = PowerPointFormatter()
+    for n in range(3):
+        formatter.create_title_slide(f"Title {n}", f"Subtitle {n}")
+        formatter.create_content_slide(f"Content {n}", [f"Point {n}", Bullet(f"Detail {n}", 1)], notes=f"Notes {n}")
+    formatter.create_content_slide("Last", ["Final point"], notes="Final notes")
+
+    prs = Presentation(formatter.save_to_buffer())
+    slides = list(prs.slides)
+    assert len(slides) == 7
+
+    sld_ids = [sld_id.get("id") for sld_id in prs.slides._sldIdLst]
+    assert len(set(sld_ids)) == len(sld_ids)
+    partnames = [slide.part.partname for slide in slides]
+    assert len(set(partnames)) == len(partnames)
+
+    for n in range(3):
+        title_slide, content_slide = slides[2 * n], slides[2 * n + 1]
+        assert title_slide.slide_layout == prs.slide_layouts[0]
+        assert title_slide.shapes.title.text == f"Title {n}"
+        assert title_slide.placeholders[1].text_frame.text == f"Subtitle {n}"
+
+        assert content_slide.slide_layout == prs.slide_layouts[1]
+        assert content_slide.shapes.title.text == f"Content {n}"
+        paragraphs = content_slide.placeholders[1].text_frame.paragraphs
+        assert [(p.text, p.level) for p in paragraphs] == [(f"Point {n}", 0), (f"Detail {n}", 1)]
+        assert content_slide.notes_slide.notes_text_frame.text == f"Notes {n}"
+    assert slides[-1].notes_slide.notes_text_frame.text == "Final notes"
+
+
+def test_reopened_deck_can_be_saved_again():
+    formatter = PowerPointFormatter()
+    for n in range(4):
+        formatter.create_content_slide(f"Slide {n}", [f"Point {n}"], notes=f"Notes {n}")
+    prs = Presentation(formatter.save_to_buffer())
+    prs.slides.add_slide(prs.slide_layouts[1])
+    out = BytesIO()
+    prs.save(out)
+    assert len(Presentation(out).slides) == 5
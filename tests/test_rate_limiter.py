@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from utils.rate_limiter import RateLimiter
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_limiter(request, tmp_path):
+    def make(**kwargs):
+        path = str(tmp_path / "buckets.sqlite3") if request.param == "sqlite" else None
+        return RateLimiter(path=path, **kwargs)
+    return make
+
+
+def test_penalty_after_idle_time_still_holds(make_limiter):
+    limiter = make_limiter(requests_per_minute=60, burst=1)
+    assert limiter.acquire() < 0.1
+    # Long enough for the bucket to refill completely before the 429 comes in
+    time.sleep(1.5)
+    limiter.penalize(1)
+    assert limiter.acquire() >= 1.5
+
+
+def test_token_debt_after_idle_time_still_holds(make_limiter):
+    limiter = make_limiter(tokens_per_minute=600, burst=1)
+    assert limiter.acquire(tokens=10) < 0.1
+    time.sleep(2)
+    # The call turned out to use 10 tokens more than estimated: one second's worth
+    limiter.settle(10, 20)
+    assert limiter.acquire(tokens=10) >= 0.8
+
+
+def test_disabled_limiter_never_waits(make_limiter):
+    limiter = make_limiter()
+    assert not limiter.enabled
+    assert limiter.acquire(tokens=10**6) == 0.0
@@ -1,8 +1,15 @@
-import requests
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
+from utils import events
 from utils.config_loader import Config
+from utils.http_client import get_perplexity_client
+from utils.query_dedup import get_query_index
+from utils.search_cache import get_search_cache
+
+SEARCH_MODEL = "sonar"
+SEARCH_TEMPERATURE = 0.2
+SEARCH_MAX_TOKENS = 2000
 
 class WebSearchToolInput(BaseModel):
     query: str = Field(..., description="The search query to look up")
@@ -14,14 +21,49 @@ class WebSearchTool(BaseTool):
 
     def _run(self, query: str) -> str:
         Config.validate()
+
+        with events.tool_call(self.name, query=query) as span:
+            span["cached"] = False
+            index = get_query_index()
+            if index is None:
+                return self._search(query, span)
+
+            entry, leader = index.claim(query)
+            if not leader:
+                try:
+                    content = entry.future.result(timeout=Config.SEARCH_DEDUP_WAIT)
+                except Exception:
+                    # The earlier search failed or is stuck; try this phrasing on its own
+                    return self._search(query, span)
+                span.update(cached=True, similar_to=entry.query)
+                return content
+
+            try:
+                content = self._search(query, span)
+            except BaseException as e:
+                index.discard(entry, e)
+                raise
+            if span.get("status") == "failed":
+                index.discard(entry, RuntimeError(span["error"]))
+            else:
+                index.resolve(entry, content)
+            return content
+
+    def _search(self, query, span):
+        cache = get_search_cache()
+        cache_key = cache.make_key(
+            query,
+            model=SEARCH_MODEL,
+            temperature=SEARCH_TEMPERATURE,
+            max_tokens=SEARCH_MAX_TOKENS
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            span["cached"] = True
+            return cached
         
-        url = "https://api.perplexity.ai/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {Config.PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
         payload = {
-            "model": "sonar",
+            "model": SEARCH_MODEL,
             "messages": [
                 {
                     "role": "system",
@@ -32,14 +74,19 @@ class WebSearchTool(BaseTool):
                     "content": query
                 }
             ],
-            "temperature": 0.2,
-            "max_tokens": 2000
+            "temperature": SEARCH_TEMPERATURE,
+            "max_tokens": SEARCH_MAX_TOKENS
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result['choices'][0]['message']['content']
+            result = get_perplexity_client().chat_completion(payload)
+            content = result['choices'][0]['message']['content']
         except Exception as e:
-            return f"Error performing web search: {str(e)}"
\ No newline at end of file
+            span.update(status="failed", error=str(e))
+            return f"Error performing web search: {str(e)}"
+
+        events.add_usage(result.get('usage'), source=self.name)
+
+        # Only successful answers are cached; errors should be retried next time
+        cache.set(cache_key, content)
+        return content
@@ -0,0 +1,127 @@
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import tempfile
+import time
+
+from utils.config_loader import Config
+
+
+def slugify(text, max_length=60):
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", text).strip("_").lower()
+    return slug[:max_length] or "presentation"
+
+
+def prompt_hash(*module_names, parent=""):
+    """Hash the source of the modules that build the prompts, so editing a prompt invalidates old checkpoints.
+
+    Modules are given by name and read from disk without importing them, so
+    this stays cheap for callers that never run an LLM stage. ``parent`` is
+    folded in first, to chain a stage's hash onto the ones before it.
+    """
+    digest = hashlib.sha256(parent.encode("utf-8"))
+    for name in module_names:
+        with open(importlib.util.find_spec(name).origin, encoding="utf-8") as f:
+            digest.update(f.read().encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RunCheckpoint:
+    """Per-run directory holding the output of every completed pipeline stage.
+
+    Runs are stored by normalized topic and any settings that change stage
+    outputs, so re-running the same request resumes from the last completed
+    stage instead of repeating paid LLM calls. ``prompts`` maps stages to
+    the hash of their prompts; a saved stage only counts while its hash
+    still matches, so editing one stage's prompt keeps the stages before it.
+    ``key`` covers the prompts too and identifies identical requests.
+    """
+
+    def __init__(self, topic, prompts, settings=None, root=None):
+        self.topic = topic
+        self.prompts = prompts
+        self.settings = settings or {}
+        material = {"topic": " ".join(topic.lower().split()), "settings": self.settings}
+        directory = hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        material["prompts"] = prompts
+        self.key = hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self.path = os.path.join(root or Config.RUNS_DIR, f"{slugify(topic, 40)}-{directory}")
+
+    def stage_path(self, stage):
+        return os.path.join(self.path, f"{stage}.md")
+
+    def prompts_path(self, stage):
+        return os.path.join(self.path, f"{stage}.prompts.txt")
+
+    def _prompts_match(self, stage):
+        if stage not in self.prompts:
+            return True
+        try:
+            with open(self.prompts_path(stage), encoding="utf-8") as f:
+                return f.read() == self.prompts[stage]
+        except FileNotFoundError:
+            return False
+
+    def load(self, stage):
+        """Return a stage's saved output, or None if the stage has not completed under the current prompts"""
+        if not self._prompts_match(stage):
+            return None
+        try:
+            with open(self.stage_path(stage), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def input_path(self, stage):
+        # Not .md, so it isn't mistaken for a completed stage
+        return os.path.join(self.path, f"{stage}.input.txt")
+
+    def load_input(self, stage):
+        """Return the input a stage's saved output was produced from, if it was recorded"""
+        try:
+            with open(self.input_path(stage), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def is_stale(self, stage, source):
+        """True when a saved stage was produced from something other than ``source``,
+        e.g. because the previous stage's output was edited by hand since"""
+        saved = self.load_input(stage)
+        return saved is not None and source is not None and saved != source
+
+    def save(self, stage, output, source=None):
+        os.makedirs(self.path, exist_ok=True)
+        if source is not None:
+            atomic_write(self.input_path(stage), source)
+        if stage in self.prompts:
+            atomic_write(self.prompts_path(stage), self.prompts[stage])
+        atomic_write(self.stage_path(stage), output)
+        atomic_write(os.path.join(self.path, "run.json"), json.dumps({
+            "topic": self.topic,
+            "settings": self.settings,
+            "completed_stages": self.completed_stages(),
+            "updated_at": time.time()
+        }, indent=2))
+
+    def completed_stages(self):
+        if not os.path.isdir(self.path):
+            return []
+        # Oldest first, i.e. in the order the stages completed
+        stages = [name for name in os.listdir(self.path) if name.endswith(".md") and self._prompts_match(name[:-3])]
+        stages.sort(key=lambda name: os.path.getmtime(os.path.join(self.path, name)))
+        return [name[:-3] for name in stages]
+
+
+def atomic_write(path, text):
+    # Write next to the target and rename so a crash never leaves a half-written file behind
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,153 @@
+import re
+
+from utils.query_dedup import jaccard, query_tokens
+
+# Rough size of a token in characters; good enough for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Sentences at least this similar to one already kept are treated as repeats
+DUPLICATE_THRESHOLD = 0.8
+
+HEADING = re.compile(r"^\s*(#{1,6}\s+\S.*|[#*\s]*(?i:slide)\s*\d+\b.*|\*\*[^*]+\*\*:?|[A-Z][^.!?]{0,80}:)\s*$")
+SLIDE_HEADING = re.compile(r"^[#*\s]*slide\s*\d+\b", re.IGNORECASE)
+SOURCES_HEADING = re.compile(r"^\s*(#{1,6}\s*)?\**\s*(sources|references|citations|further reading)\b", re.IGNORECASE)
+MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\(https?://[^)]+\)")
+URL = re.compile(r"\(?<?https?://\S+")
+CITATION = re.compile(r"\s*\[\d+(?:\s*[,-]\s*\d+)*\]")
+BOILERPLATE = re.compile(
+    r"^\s*(i hope (this|that) helps|let me know|feel free to|if you (need|have|want)|please note that|"
+    r"as an ai|as of my (last|knowledge)|note: (this|these|the) (information|data)|in summary, the above)",
+    re.IGNORECASE
+)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+NUMBER = re.compile(r"\d")
+SOURCE_ENTRY = re.compile(r"^\s*([-*•]|\d{1,3}[.)]|\[\d+\])|https?://")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clean_line(line):
+    """Strip links, bare URLs and citation markers from one line"""
+    line = MARKDOWN_LINK.sub(r"\1", line)
+    line = URL.sub("", line)
+    line = CITATION.sub("", line)
+    return line.rstrip()
+
+
+def _blocks(text):
+    """Split text into (is_heading, line) pairs, dropping source lists and boilerplate"""
+    blocks = []
+    in_sources = False
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        if SOURCES_HEADING.match(raw):
+            in_sources = True
+            continue
+        if in_sources and SOURCE_ENTRY.search(raw):
+            continue
+        in_sources = False
+        is_heading = bool(HEADING.match(raw))
+        if BOILERPLATE.match(raw.lstrip("-*• ")):
+            continue
+        line = clean_line(raw)
+        if line.strip(" -*•"):
+            blocks.append((is_heading, line))
+    return blocks
+
+
+def _dedupe(blocks):
+    """Drop sentences that repeat (or nearly repeat) one seen earlier.
+
+    In an outline each slide stands alone, so repeats are only looked for
+    within the same slide.
+    """
+    seen = []
+    kept = []
+    for is_heading, line in blocks:
+        if is_heading:
+            if SLIDE_HEADING.match(line):
+                seen = []
+            kept.append((True, line))
+            continue
+        sentences = []
+        for sentence in SENTENCE_END.split(line):
+            tokens = query_tokens(sentence)
+            if tokens and any(jaccard(tokens, other) >= DUPLICATE_THRESHOLD for other in seen):
+                continue
+            seen.append(tokens)
+            sentences.append(sentence)
+        text = " ".join(sentences)
+        if text.strip(" -*•"):
+            kept.append((False, text))
+    return kept
+
+
+def _score(line, topic_tokens, first_in_section):
+    """Value of a passage per token: dense, factual, on-topic text scores highest"""
+    tokens = query_tokens(line)
+    score = len(tokens)
+    score += 2 * len(tokens & topic_tokens)
+    if NUMBER.search(line):
+        score *= 1.5
+    if first_in_section:
+        score *= 2
+    return score / max(estimate_tokens(line), 1)
+
+
+def _select(blocks, budget, topic):
+    """Keep the highest-value passages that fit in ``budget`` tokens, in their original order"""
+    topic_tokens = query_tokens(topic or "")
+    used = sum(estimate_tokens(line) + 1 for is_heading, line in blocks if is_heading)
+    candidates = []
+    first_in_section = True
+    for i, (is_heading, line) in enumerate(blocks):
+        if is_heading:
+            first_in_section = True
+            continue
+        candidates.append((_score(line, topic_tokens, first_in_section), i))
+        first_in_section = False
+
+    keep = {i for i, (is_heading, _) in enumerate(blocks) if is_heading}
+    for _, i in sorted(candidates, reverse=True):
+        cost = estimate_tokens(blocks[i][1]) + 1
+        if used + cost <= budget:
+            keep.add(i)
+            used += cost
+
+    return [block for i, block in enumerate(blocks) if i in keep]
+
+
+def _heading_level(line):
+    hashes = len(line.lstrip()) - len(line.lstrip().lstrip("#"))
+    return hashes or 7
+
+
+def _drop_empty_sections(blocks):
+    """Headings whose whole section was dropped are just noise; slide headings still mark a slide"""
+    kept = []
+    for i, (is_heading, line) in enumerate(blocks):
+        if is_heading and not SLIDE_HEADING.match(line):
+            following = blocks[i + 1] if i + 1 < len(blocks) else None
+            if following is None or (following[0] and _heading_level(following[1]) <= _heading_level(line)):
+                continue
+        kept.append((is_heading, line))
+    return kept
+
+
+def compact(text, budget, topic=None):
+    """Shrink stage context to at most ``budget`` estimated tokens.
+
+    Text that already fits is returned unchanged. Otherwise source lists,
+    URLs, citation markers and filler sentences are removed and repeated
+    facts are dropped; if the text is still over budget, the passages with
+    the most facts and topic terms per token are kept.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    blocks = _dedupe(_blocks(text))
+    if sum(estimate_tokens(line) + 1 for _, line in blocks) > budget:
+        blocks = _select(blocks, budget, topic)
+    return "\n".join(line for _, line in _drop_empty_sections(blocks))
@@ -1,12 +1,111 @@
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+def _find_dotenv():
+    """Nearest .env in this package's directory or its parents (where python-dotenv would look)"""
+    for directory in Path(__file__).resolve().parents:
+        candidate = directory / ".env"
+        if candidate.is_file():
+            return candidate
+    return None
+
+# python-dotenv is only imported when there is a .env file to load
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 class Config:
     PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+    PERPLEXITY_BASE_URL = os.getenv("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+
+    # Shared HTTP client for direct Perplexity calls
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))  # seconds
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 60))  # seconds
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))  # seconds
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 30))  # seconds
+    HTTP_MAX_IN_FLIGHT = int(os.getenv("HTTP_MAX_IN_FLIGHT", 8))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+
+    # Client-side rate limit shared by the LLM and web searches (off unless set; 0 disables either limit);
+    # up to RATE_LIMIT_BURST seconds' worth of calls may go out at once
+    RATE_LIMIT_RPM = int(os.getenv("RATE_LIMIT_RPM", 0))
+    RATE_LIMIT_TPM = int(os.getenv("RATE_LIMIT_TPM", 0))
+    RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 10))
+    # SQLite file that makes every process pointed at it share one budget
+    RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB") or None
+
+    # On-disk cache for web search results
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(".cache", "search_cache.sqlite3"))
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 24 * 60 * 60))  # seconds
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1000))
+
+    # Near-duplicate queries within a run share one search; a threshold of 0 disables this
+    SEARCH_DEDUP_THRESHOLD = float(os.getenv("SEARCH_DEDUP_THRESHOLD", 0.75))  # Jaccard similarity
+    SEARCH_DEDUP_WINDOW = int(os.getenv("SEARCH_DEDUP_WINDOW", 15 * 60))  # seconds
+    SEARCH_DEDUP_MAX_ENTRIES = int(os.getenv("SEARCH_DEDUP_MAX_ENTRIES", 256))
+    # How long a duplicate waits for the earlier search before sending its own
+    SEARCH_DEDUP_WAIT = float(os.getenv("SEARCH_DEDUP_WAIT", 120))  # seconds
+
+    # "agent" (one researcher agent) or "parallel" (one concurrent search per facet)
+    RESEARCH_MODE = os.getenv("RESEARCH_MODE", "agent")
+
+    # "full" (research, organize and generate agents) or "fast" (organizer JSON rendered directly)
+    PIPELINE_MODE = os.getenv("PIPELINE_MODE", "full")
+
+    # Estimated-token budget for the research report passed to the organizer and the
+    # outline passed to the generator; larger inputs are compacted first (0 disables)
+    ORGANIZE_TOKEN_BUDGET = int(os.getenv("ORGANIZE_TOKEN_BUDGET", 3000))
+    GENERATE_TOKEN_BUDGET = int(os.getenv("GENERATE_TOKEN_BUDGET", 3000))
+
+    # Stream LLM output token by token (enables live output in the UI and event log)
+    LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() in ("1", "true", "yes")
+
+    # Append every run's progress events to this JSONL file when set
+    EVENTS_LOG = os.getenv("EVENTS_LOG")
+
+    # Append a timing/usage summary of every finished run to this JSONL file when set
+    METRICS_JSONL = os.getenv("METRICS_JSONL")
+
+    # Serve Prometheus metrics at http://<host>:<port>/metrics from the web app when set
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0)) or None
+
+    # Optional .pptx whose slide master/layouts are used for every deck
+    PPTX_TEMPLATE = os.getenv("PPTX_TEMPLATE") or None
+
+    # Worker processes and per-deck timeout (seconds) for bulk re-rendering with rerender.py
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", 0)) or None  # None: one per CPU
+    RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", 120))
+
+    # Where each run's per-stage outputs are checkpointed for resuming
+    RUNS_DIR = os.getenv("RUNS_DIR", "runs")
+
+    # Number of decks batch.py generates concurrently
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+
+    # Generations the Streamlit app runs at once; further requests are queued
+    MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 2))
+
+    # Identical web requests share one run; finished decks are re-served for this long (seconds)
+    JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 60 * 60))
+    JOB_RESULT_CACHE_SIZE = int(os.getenv("JOB_RESULT_CACHE_SIZE", 32))
+
+    # The Streamlit app serves decks from memory; set to also keep a copy in output/
+    SAVE_WEB_DECKS = os.getenv("SAVE_WEB_DECKS", "false").lower() in ("1", "true", "yes")
+
+    # Headless API server (server.py): bind address, worker threads and the SQLite job queue
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", 8000))
+    API_WORKERS = int(os.getenv("API_WORKERS", 2))
+    # Submissions are refused with 429 once this many jobs are waiting; 0 disables the limit
+    API_MAX_QUEUED = int(os.getenv("API_MAX_QUEUED", 20))
+    API_DB_PATH = os.getenv("API_DB_PATH", os.path.join(".cache", "jobs.sqlite3"))
+    API_OUTPUT_DIR = os.getenv("API_OUTPUT_DIR", os.path.join("output", "api"))
+    # Running jobs without a heartbeat for this many seconds are requeued
+    API_LEASE_SECONDS = int(os.getenv("API_LEASE_SECONDS", 120))
     
     @classmethod
     def validate(cls):
         if not cls.PERPLEXITY_API_KEY:
-            raise ValueError("PERPLEXITY_API_KEY not found in environment variables")
\ No newline at end of file
+            raise ValueError("PERPLEXITY_API_KEY not found in environment variables")
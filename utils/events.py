@@ -0,0 +1,202 @@
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from utils.config_loader import Config
+from utils.metrics import RunMetrics
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+class EventStream:
+    """Structured progress events for one pipeline run.
+
+    Events are plain dicts with a ``type`` (stage_start/stage_end,
+    tool_start/tool_end, step_start/step_end, token, token_usage, ...), a
+    timestamp and the run ID. Subscribers are called synchronously, in the
+    emitting thread. ``metrics`` is always subscribed and times the run.
+    """
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.metrics = self.subscribe(RunMetrics(self.run_id, jsonl_path=Config.METRICS_JSONL))
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def emit(self, type, **data):
+        event = {"type": type, "time": time.time(), "run_id": self.run_id, **data}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+        return event
+
+    def add_usage(self, usage, source):
+        """Add one call's token usage and emit the cumulative totals"""
+        with self._lock:
+            for field in USAGE_FIELDS:
+                self.usage[field] += int(usage.get(field) or 0)
+            totals = dict(self.usage)
+        self.emit("token_usage", source=source, **totals)
+
+    @contextmanager
+    def _span(self, kind, name, **data):
+        # The yielded dict lets the caller attach details only known at the end (e.g. cache hits)
+        extra = {}
+        started = time.perf_counter()
+        self.emit(f"{kind}_start", name=name, **data)
+        try:
+            yield extra
+        except BaseException as e:
+            extra.update(status="failed", error=str(e))
+            raise
+        else:
+            extra.setdefault("status", "ok")
+        finally:
+            self.emit(f"{kind}_end", **{**data, **extra, "name": name,
+                                         "seconds": round(time.perf_counter() - started, 3)})
+
+    def stage(self, name, **data):
+        return self._span("stage", name, **data)
+
+    def tool_call(self, name, **data):
+        return self._span("tool", name, **data)
+
+    def step(self, name, **data):
+        """Time one step inside a stage, e.g. parsing or saving while rendering"""
+        return self._span("step", name, **data)
+
+
+class JsonlEventWriter:
+    """Subscriber that appends every event to a JSONL file"""
+
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+_current = contextvars.ContextVar("event_stream", default=None)
+
+# crewai reports LLM events globally; agent IDs route them back to the run that owns the agent
+_agent_streams = {}
+_bridge_installed = False
+_bridge_lock = threading.Lock()
+
+
+def current():
+    """The EventStream of the run executing in this context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def use(stream):
+    token = _current.set(stream)
+    try:
+        yield stream
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def _null_span():
+    yield {}
+
+
+def tool_call(name, **data):
+    """Time a tool call on the current run's stream; a no-op outside a run"""
+    stream = current()
+    return stream.tool_call(name, **data) if stream else _null_span()
+
+
+def add_usage(usage, source):
+    stream = current()
+    if stream and usage:
+        stream.add_usage(usage, source)
+
+
+@contextmanager
+def attach_agent(agent, stream):
+    """Route crewai LLM events raised for ``agent`` to ``stream`` while it runs"""
+    install_crewai_bridge()
+    _agent_streams[str(agent.id)] = stream
+    try:
+        yield
+    finally:
+        _agent_streams.pop(str(agent.id), None)
+
+
+def _stream_for(event):
+    return _agent_streams.get(getattr(event, "agent_id", None)) or current()
+
+
+def _on_stream_chunk(source, event):
+    stream = _stream_for(event)
+    if stream and event.chunk:
+        stream.emit("token", text=event.chunk, agent=event.agent_role)
+
+
+def _on_llm_completed(source, event):
+    stream = _stream_for(event)
+    if stream and event.usage:
+        stream.add_usage(event.usage, source="llm")
+
+
+def install_crewai_bridge():
+    """Forward crewai's token chunk and LLM usage events into our streams (no-op on crewai versions without them)"""
+    global _bridge_installed
+    with _bridge_lock:
+        if _bridge_installed:
+            return
+        _bridge_installed = True
+        try:
+            from crewai.events import LLMCallCompletedEvent, LLMStreamChunkEvent, crewai_event_bus
+        except ImportError:
+            return
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, _on_stream_chunk)
+        crewai_event_bus.register_handler(LLMCallCompletedEvent, _on_llm_completed)
+
+
+def format_event(event):
+    """One-line human readable description of an event, or None for events not worth printing"""
+    kind = event["type"]
+    if kind == "stage_start":
+        resumed = " (from checkpoint)" if event.get("cached") else ""
+        return f"▶ {event['name']}{resumed}"
+    if kind == "stage_end":
+        mark = "✔" if event["status"] == "ok" else "✖"
+        return f"{mark} {event['name']} finished in {event['seconds']:.1f}s"
+    if kind == "tool_end":
+        cached = " (cached)" if event.get("cached") else ""
+        if event.get("similar_to"):
+            cached = f" (same as {event['similar_to'][:40]!r})"
+        query = event.get("query", "")
+        return f"  🔍 {event['name']}{cached} {event['seconds']:.2f}s: {query[:80]}"
+    if kind == "context_compacted":
+        return f"  ✂ {event['stage']} input: {event['tokens_before']} → {event['tokens_after']} tokens"
+    if kind == "slides_regenerated":
+        return f"  ♻ {event['stage']}: rewrote {event['regenerated']}, kept {event['reused']} slides"
+    if kind == "deck_updated":
+        return f"  ♻ deck: re-rendered {event['rendered']} of {event['slides']} slides, removed {event['removed']}"
+    if kind == "rate_limit_wait":
+        return f"  ⏳ {event['kind']} call waited {event['seconds']:.1f}s for the rate limit"
+    if kind == "token_usage":
+        return f"  🧮 {event['total_tokens']} tokens used so far"
+    return None
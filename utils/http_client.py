@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config_loader import Config
+from utils.rate_limiter import estimate_call_tokens, get_rate_limiter
+
+# Responses worth retrying: rate limiting and transient server-side failures
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PerplexityClient:
+    """Pooled keep-alive HTTP client for direct Perplexity API calls.
+
+    A single ``requests.Session`` is shared so connections are reused across
+    calls and threads. Every request gets connect/read timeouts, transient
+    failures are retried with jittered exponential backoff (honouring
+    ``Retry-After``), and at most ``max_in_flight`` requests run at once.
+    Every attempt first waits for ``rate_limiter`` when one is given.
+    """
+
+    def __init__(self, base_url, connect_timeout=5.0, read_timeout=60.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=30.0, max_in_flight=8, pool_size=10, rate_limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt):
+        # "Full jitter": spread retries uniformly so parallel callers don't stampede
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(self.backoff_max, max(0.0, delay))
+
+    def post(self, path, payload):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        headers = {
+            "Authorization": f"Bearer {Config.PERPLEXITY_API_KEY}",
+            "Content-Type": "application/json"
+        }
+
+        estimate = estimate_call_tokens(payload.get("messages", []), payload.get("max_tokens"))
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self.rate_limiter:
+                self.rate_limiter.acquire(estimate, kind="search")
+            with self._in_flight:
+                try:
+                    response = self.session.post(url, headers=headers, json=payload, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout):
+                    self._settle(estimate, 0)
+                    if last_attempt:
+                        raise
+                    delay = self._backoff(attempt)
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                        response.raise_for_status()
+                        result = response.json()
+                        self._settle(estimate, (result.get("usage") or {}).get("total_tokens"))
+                        return result
+                    self._settle(estimate, 0)
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = self._backoff(attempt)
+                    if response.status_code == 429 and self.rate_limiter:
+                        # Hold back every caller sharing the limiter, not just this one
+                        self.rate_limiter.penalize(delay, kind="search")
+            # Sleep outside the semaphore so waiting retries don't hold a slot
+            time.sleep(delay)
+
+    def _settle(self, estimate, actual):
+        if self.rate_limiter:
+            self.rate_limiter.settle(estimate, actual)
+
+    def chat_completion(self, payload):
+        return self.post("/chat/completions", payload)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_perplexity_client():
+    """Return the process-wide Perplexity HTTP client, creating it on first use"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PerplexityClient(
+                Config.PERPLEXITY_BASE_URL,
+                connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+                read_timeout=Config.HTTP_READ_TIMEOUT,
+                max_retries=Config.HTTP_MAX_RETRIES,
+                backoff_base=Config.HTTP_BACKOFF_BASE,
+                backoff_max=Config.HTTP_BACKOFF_MAX,
+                max_in_flight=Config.HTTP_MAX_IN_FLIGHT,
+                pool_size=Config.HTTP_POOL_SIZE,
+                rate_limiter=get_rate_limiter()
+            )
+        return _client
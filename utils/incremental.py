@@ -0,0 +1,132 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from utils.checkpoint import atomic_write
+from utils.outline_parser import parse_outline
+from utils.slide_model import Bullet, Slide
+
+SLIDE_HEADER = re.compile(r"^[#*\s]*slide\s*\d+\b", re.IGNORECASE)
+SLIDE_NUMBER = re.compile(r"^[#*\s]*slide\s*\d+\s*[:.)\-–—]?\s*", re.IGNORECASE)
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+\S")
+
+
+def slide_key(slide):
+    """Content hash of a slide; equal keys render to identical slides"""
+    material = [slide.title, [(bullet.text, bullet.level) for bullet in slide.bullets], slide.notes]
+    return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+
+def match_slides(old_keys, new_keys):
+    """For each new slide, the index of an identical old slide it can reuse, or None.
+
+    Unchanged runs are matched in order first, then any leftover identical
+    slides (moved ones). The title slide has its own layout, so it only ever
+    stands in for itself.
+    """
+    reuse = [None] * len(new_keys)
+    used = set()
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            old, new = block.a + offset, block.b + offset
+            if (old == 0) == (new == 0):
+                reuse[new] = old
+                used.add(old)
+
+    leftovers = {}
+    for old, key in enumerate(old_keys):
+        if old not in used:
+            leftovers.setdefault(key, []).append(old)
+    for new, key in enumerate(new_keys):
+        if reuse[new] is not None:
+            continue
+        for old in leftovers.get(key, []):
+            if old not in used and (old == 0) == (new == 0):
+                reuse[new] = old
+                used.add(old)
+                break
+    return reuse
+
+
+def slide_model_path(deck_path):
+    return os.path.splitext(deck_path)[0] + ".slides.json"
+
+
+def save_slide_model(deck_path, slides):
+    """Record the slides a deck was rendered from, next to the .pptx"""
+    data = {
+        "slides": [
+            {"title": slide.title, "bullets": [[bullet.text, bullet.level] for bullet in slide.bullets], "notes": slide.notes}
+            for slide in slides
+        ]
+    }
+    atomic_write(slide_model_path(deck_path), json.dumps(data))
+
+
+def load_slide_model(deck_path):
+    """The slides a deck was last rendered from, or None if they weren't recorded"""
+    try:
+        with open(slide_model_path(deck_path), encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    return [
+        Slide.model_construct(title=slide["title"], bullets=[Bullet(text, level) for text, level in slide["bullets"]],
+                              notes=slide["notes"])
+        for slide in data["slides"]
+    ]
+
+
+def split_sections(outline):
+    """Split an organizer outline into one section per slide, dropping any preamble.
+
+    Sections start at "Slide N" headers when there are any, otherwise at the
+    most common markdown heading level (so a single top-level title doesn't
+    count as a section).
+    """
+    lines = outline.splitlines()
+    if any(SLIDE_HEADER.match(line) for line in lines):
+        starts = [bool(SLIDE_HEADER.match(line)) for line in lines]
+    else:
+        levels = [len(m.group(1)) if (m := MARKDOWN_HEADING.match(line)) else None for line in lines]
+        counts = Counter(level for level in levels if level)
+        if not counts:
+            return []
+        level = max(counts, key=lambda lv: (counts[lv], -lv))
+        starts = [lv == level for lv in levels]
+
+    sections = []
+    for line, start in zip(lines, starts):
+        if start:
+            sections.append([line])
+        elif sections:
+            sections[-1].append(line)
+    return ["\n".join(section).strip() for section in sections]
+
+
+def _section_key(section):
+    # Without the slide number, inserting a slide doesn't make every later section look edited
+    return " ".join(SLIDE_NUMBER.sub("", section, count=1).lower().split())
+
+
+def plan_regeneration(previous_source, source, previous_output):
+    """Work out which generated slides survive an edit of the outline they were written from.
+
+    Returns ``(slides, changed)``: ``slides`` has one entry per section of
+    ``source``, the reused Slide or None, and ``changed`` lists the sections
+    whose slides have to be written again. Returns None when the previous
+    outline's sections don't line up one-to-one with the generated slides.
+    """
+    old_sections = split_sections(previous_source)
+    new_sections = split_sections(source)
+    old_slides = parse_outline(previous_output)
+    if not old_sections or not new_sections or len(old_sections) != len(old_slides):
+        return None
+    reuse = match_slides([_section_key(s) for s in old_sections], [_section_key(s) for s in new_sections])
+    slides = [old_slides[old] if old is not None else None for old in reuse]
+    changed = [section for section, old in zip(new_sections, reuse) if old is None]
+    return slides, changed
@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Fields callers may read back from a job row
+JOB_FIELDS = (
+    "id", "topic", "filename", "settings", "status", "stage", "progress", "error",
+    "output_path", "outputs", "worker", "created_at", "started_at", "finished_at", "heartbeat_at"
+)
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.enqueue when ``max_queued`` jobs are already waiting"""
+
+
+class LeaseLost(Exception):
+    """Raised to stop a job whose lease expired and which was handed to another worker"""
+
+
+class JobQueue:
+    """Persistent job queue in a SQLite file.
+
+    Several worker threads, and several server processes pointed at the same
+    file, can share one queue: ``claim`` hands each queued job to exactly one
+    worker, and running jobs whose worker stopped sending heartbeats for
+    ``lease`` seconds are put back in the queue so a crash doesn't lose them.
+    """
+
+    def __init__(self, path, max_queued=20, lease=120):
+        self.path = path
+        self.max_queued = max_queued
+        self.lease = lease
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    settings TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    error TEXT,
+                    output_path TEXT,
+                    outputs TEXT,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    heartbeat_at REAL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            # Queues created before deck variants lack the column for their output paths
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "outputs" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN outputs TEXT")
+
+    def _connection(self):
+        # One connection per thread; sqlite3 connections shouldn't be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # Readers (status polls) don't block the writer claiming jobs
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _connect(self):
+        """Write transaction; reads go straight to ``_connection`` so polls never take the write lock"""
+        return _Transaction(self._connection())
+
+    def enqueue(self, topic, filename, settings=None):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            (queued,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+            if self.max_queued and queued >= self.max_queued:
+                raise QueueFull(f"{queued} jobs already queued")
+            conn.execute(
+                "INSERT INTO jobs (id, topic, filename, settings, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, topic, filename, json.dumps(settings or {}), time.time())
+            )
+        return job_id
+
+    def claim(self, worker):
+        """Mark the oldest queued job as running for ``worker`` and return it, or None if there is none"""
+        now = time.time()
+        with self._connect() as conn:
+            if self.lease:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND heartbeat_at < ?",
+                    (now - self.lease,)
+                )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """UPDATE jobs SET status = 'running', worker = ?, stage = NULL, progress = 0,
+                   started_at = ?, heartbeat_at = ? WHERE id = ?""",
+                (worker, now, now, row["id"])
+            )
+        return self.get(row["id"])
+
+    def update(self, job_id, worker=None, **fields):
+        """Set fields of a job; return False if nothing was updated.
+
+        With ``worker`` only a running job still claimed by that worker is
+        updated, so a worker whose lease expired can't overwrite the job once
+        someone else has claimed it.
+        """
+        unknown = set(fields) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {sorted(unknown)}")
+        if "outputs" in fields:
+            fields["outputs"] = json.dumps(fields["outputs"])
+        fields["heartbeat_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        query, params = f"UPDATE jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id]
+        if worker is not None:
+            query += " AND status = 'running' AND worker = ?"
+            params.append(worker)
+        with self._connect() as conn:
+            return conn.execute(query, params).rowcount > 0
+
+    def heartbeat(self, job_id, worker=None):
+        return self.update(job_id, worker=worker)
+
+    def get(self, job_id):
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        job["outputs"] = json.loads(job["outputs"]) if job["outputs"] else None
+        return job
+
+    def queue_position(self, job_id):
+        """1-based position among queued jobs, or 0 if the job is not waiting"""
+        row = self._connection().execute(
+            """SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at <= (
+                   SELECT created_at FROM jobs WHERE id = ? AND status = 'queued')""",
+            (job_id,)
+        ).fetchone()
+        return row[0]
+
+    def counts(self):
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class _Transaction:
+    """Context manager running a block in one IMMEDIATE transaction, so claims can't race"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
@@ -0,0 +1,228 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.events import EventStream
+from utils.pipeline import STAGES, generate_outline, get_checkpoint, render_deck
+
+# How much live LLM output a job keeps for display
+OUTPUT_TAIL_CHARS = 4000
+
+class Job:
+    """State of a single background presentation generation"""
+
+    def __init__(self, topic, filename):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.filename = filename
+        self.status = "queued"  # queued -> running -> completed | failed
+        self.stage = None
+        self.progress = 0.0
+        self.deck = None  # .pptx bytes
+        self.output_path = None  # only set when decks are also saved to disk
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.shared_with = None  # ID of the job whose identical, already started run this one shares
+        self.cached = False  # served from a recently completed identical run
+        
+        self.events = EventStream(run_id=self.id)
+        self.recent_events = deque(maxlen=50)
+        self.output_tail = ""
+        self.events.subscribe(self._record_event)
+
+    @property
+    def done(self):
+        return self.status in ("completed", "failed")
+
+    def set_stage(self, stage):
+        self.stage = stage
+        self.progress = STAGES.index(stage) / len(STAGES)
+
+    def _record_event(self, event):
+        if event["type"] == "token":
+            self.output_tail = (self.output_tail + event["text"])[-OUTPUT_TAIL_CHARS:]
+        else:
+            self.recent_events.append(event)
+
+class _Flight:
+    """One pipeline run shared by every job that asked for the same deck while it was in progress"""
+
+    def __init__(self, key, leader):
+        self.key = key
+        self.leader = leader
+        self.jobs = [leader]
+
+    def attach(self, job):
+        # Followers mirror the leader's stage and events for display
+        job.shared_with = self.leader.id
+        job.events = self.leader.events
+        job.status = self.leader.status
+        job.started_at = self.leader.started_at
+        if self.leader.stage:
+            job.set_stage(self.leader.stage)
+        job.recent_events.extend(self.leader.recent_events)
+        self.leader.events.subscribe(job._record_event)
+        self.jobs.append(job)
+
+    def set_stage(self, stage):
+        for job in self.jobs:
+            job.set_stage(stage)
+
+class JobRunner:
+    """Runs presentation generations on a bounded thread pool.
+
+    At most ``max_workers`` jobs run at once; the rest wait in the executor's
+    queue. Callers poll jobs by ID instead of blocking on the whole run.
+
+    Requests are coalesced on the checkpoint key (normalized topic, prompts
+    and pipeline settings): a request identical to one already queued or
+    running attaches to it instead of starting another crew, and one
+    identical to a run that finished within ``result_ttl`` seconds is served
+    from the last ``result_cache_size`` results straight away.
+    """
+
+    def __init__(self, max_workers=2, max_history=100, event_log=None, output_dir=None,
+                 result_ttl=3600, result_cache_size=32):
+        self.max_history = max_history
+        self.event_log = event_log
+        self.output_dir = output_dir
+        self.result_ttl = result_ttl
+        self.result_cache_size = result_cache_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ppt-job")
+        self._jobs = {}
+        self._flights = {}
+        self._results = OrderedDict()  # key -> (finished_at, deck, outline)
+        self._lock = threading.Lock()
+
+    def submit(self, topic, filename):
+        job = Job(topic, filename)
+        if self.event_log:
+            job.events.subscribe(self.event_log)
+        key = get_checkpoint(topic).key
+        flight = None
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            cached = self._cached_result(key)
+            if cached is None:
+                if key in self._flights:
+                    self._flights[key].attach(job)
+                else:
+                    flight = self._flights[key] = _Flight(key, job)
+        if cached is not None:
+            self._complete_from_cache(job, *cached)
+        elif flight is not None:
+            self._executor.submit(self._run, flight)
+        return job.id
+
+    def _cached_result(self, key):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if self.result_ttl and time.time() - entry[0] > self.result_ttl:
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return entry[1:]
+
+    def _complete_from_cache(self, job, deck, outline):
+        job.cached = True
+        job.started_at = job.finished_at = time.time()
+        job.deck = deck
+        job.result = outline
+        job.progress = 1.0
+        job.events.emit("result_cached", topic=job.topic)
+        if self.output_dir:
+            job.output_path = self._persist(job)
+        job.status = "completed"
+
+    def _remember(self, key, deck, outline):
+        with self._lock:
+            self._results[key] = (time.time(), deck, outline)
+            self._results.move_to_end(key)
+            while len(self._results) > self.result_cache_size:
+                self._results.popitem(last=False)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """1-based position among queued jobs, or 0 if the job is no longer waiting"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.shared_with:
+                job_id = job.shared_with
+            # Jobs sharing another's run don't take a place in the queue
+            queued = [j for j in self._jobs.values() if j.status == "queued" and not j.shared_with]
+        queued.sort(key=lambda j: j.created_at)
+        for position, job in enumerate(queued, start=1):
+            if job.id == job_id:
+                return position
+        return 0
+
+    def _run(self, flight):
+        leader = flight.leader
+        with self._lock:
+            for job in flight.jobs:
+                job.started_at = time.time()
+                job.status = "running"
+        outline = deck = error = None
+        try:
+            outline = generate_outline(leader.topic, verbose=False, on_stage=flight.set_stage, event_stream=leader.events)
+            deck = render_deck(outline, event_stream=leader.events).getvalue()
+            if self.result_cache_size:
+                self._remember(flight.key, deck, outline)
+        except Exception as e:
+            error = str(e)
+        finally:
+            # From here on identical requests start a new run or hit the result cache
+            with self._lock:
+                self._flights.pop(flight.key, None)
+                jobs = list(flight.jobs)
+        for job in jobs:
+            self._finish(job, outline, deck, error)
+
+    def _finish(self, job, outline, deck, error):
+        if error is None:
+            job.result = outline
+            job.deck = deck
+            try:
+                if self.output_dir:
+                    job.output_path = self._persist(job)
+            except Exception as e:
+                error = str(e)
+        job.error = error
+        job.progress = 1.0 if error is None else job.progress
+        job.finished_at = time.time()
+        job.status = "failed" if error else "completed"
+
+    def _persist(self, job):
+        # The job ID keeps users who pick the same filename from overwriting each other
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{job.filename}_{job.id[:8]}.pptx")
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".pptx.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(job.deck)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return path
+
+    def _prune(self):
+        # Forget the oldest finished jobs so a long-lived server doesn't grow without bound
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.created_at)
+        for job in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job.id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -1,11 +1,60 @@
+import asyncio
+
 from crewai import LLM
 from utils.config_loader import Config
+from utils.compaction import estimate_tokens
+from utils.rate_limiter import estimate_call_tokens, get_rate_limiter
+
+# Seconds every caller is held back after the LLM endpoint answers 429
+RATE_LIMITED_PAUSE = 5
+
+
+class RateLimitedLLM(LLM):
+    """crewai LLM whose calls first wait for the process-wide Perplexity rate limiter"""
+
+    def call(self, messages, *args, **kwargs):
+        limiter = get_rate_limiter()
+        estimate = estimate_call_tokens(messages, self.max_tokens)
+        limiter.acquire(estimate, kind="llm")
+        try:
+            result = super().call(messages, *args, **kwargs)
+        except Exception as e:
+            _report_failure(limiter, estimate, e)
+            raise
+        _report_usage(limiter, estimate, messages, result)
+        return result
+
+    async def acall(self, messages, *args, **kwargs):
+        limiter = get_rate_limiter()
+        estimate = estimate_call_tokens(messages, self.max_tokens)
+        # Wait in a thread so the event loop keeps serving other calls
+        await asyncio.to_thread(limiter.acquire, estimate, "llm")
+        try:
+            result = await super().acall(messages, *args, **kwargs)
+        except Exception as e:
+            _report_failure(limiter, estimate, e)
+            raise
+        _report_usage(limiter, estimate, messages, result)
+        return result
+
+
+def _report_failure(limiter, estimate, error):
+    limiter.settle(estimate, 0)
+    if getattr(error, "status_code", None) == 429:
+        limiter.penalize(RATE_LIMITED_PAUSE, kind="llm")
+
+
+def _report_usage(limiter, estimate, messages, result):
+    if isinstance(result, str):
+        limiter.settle(estimate, estimate_call_tokens(messages, estimate_tokens(result)))
+
 
 def get_perplexity_llm():
     """Configure CrewAI to use Perplexity API"""
-    return LLM(
+    return RateLimitedLLM(
         model="perplexity/sonar",
         api_key=Config.PERPLEXITY_API_KEY,
-        base_url="https://api.perplexity.ai",
-        temperature=0.1
-    )
\ No newline at end of file
+        base_url=Config.PERPLEXITY_BASE_URL,
+        temperature=0.1,
+        stream=Config.LLM_STREAM
+    )
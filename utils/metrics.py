@@ -0,0 +1,249 @@
+import bisect
+import json
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._values = {}  # label key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def samples(self):
+        with self._lock:
+            return {key: list(counts) for key, counts in self._values.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts in sorted(self.samples().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {round(counts[-1], 6)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, exportable in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, help, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def histogram(self, name, help="", buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render_prometheus(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram("ppt_stage_seconds", "Pipeline stage duration")
+TOOL_SECONDS = REGISTRY.histogram("ppt_tool_call_seconds", "Tool call duration")
+TOOL_CALLS = REGISTRY.counter("ppt_tool_calls_total", "Tool calls by outcome (ok, cached, failed)")
+STEP_SECONDS = REGISTRY.histogram("ppt_render_step_seconds", "Deck rendering step duration (parse, build, save)")
+TOKENS = REGISTRY.counter("ppt_tokens_total", "LLM and search tokens used")
+RUNS = REGISTRY.counter("ppt_runs_total", "Finished pipeline runs by status")
+
+
+class RunMetrics:
+    """EventStream subscriber that times one run and feeds the process-wide registry.
+
+    Stage, tool and render step spans become histogram observations, token
+    usage becomes counter increments, and ``summary()`` totals it all for
+    the run. When ``jsonl_path`` is set the summary is appended to it once
+    the render stage ends.
+    """
+
+    def __init__(self, run_id=None, jsonl_path=None):
+        self.run_id = run_id
+        self.jsonl_path = jsonl_path
+        self.started_at = time.time()
+        self.stages = {}
+        self.steps = {}
+        self.tool_calls = {"ok": 0, "cached": 0, "failed": 0}
+        self.tool_seconds = 0.0
+        self.rate_limit_waits = 0
+        self.rate_limit_seconds = 0.0
+        self.tokens = {}
+        self._usage_seen = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        kind = event["type"]
+        if kind == "stage_end":
+            self._on_stage_end(event)
+        elif kind == "tool_end":
+            outcome = "failed" if event["status"] != "ok" else "cached" if event.get("cached") else "ok"
+            TOOL_CALLS.inc(tool=event["name"], outcome=outcome)
+            TOOL_SECONDS.observe(event["seconds"], tool=event["name"])
+            with self._lock:
+                self.tool_calls[outcome] += 1
+                self.tool_seconds += event["seconds"]
+        elif kind == "step_end":
+            STEP_SECONDS.observe(event["seconds"], step=event["name"])
+            with self._lock:
+                self.steps[event["name"]] = self.steps.get(event["name"], 0) + event["seconds"]
+        elif kind == "rate_limit_wait":
+            with self._lock:
+                self.rate_limit_waits += 1
+                self.rate_limit_seconds += event["seconds"]
+        elif kind == "token_usage":
+            self._on_usage(event)
+
+    def _on_stage_end(self, event):
+        STAGE_SECONDS.observe(event["seconds"], stage=event["name"], status=event["status"],
+                              cached="true" if event.get("cached") else "false")
+        with self._lock:
+            self.stages[event["name"]] = event["seconds"]
+        if event["status"] != "ok":
+            RUNS.inc(status="failed")
+        elif event["name"] == "render":
+            RUNS.inc(status="ok")
+            if self.jsonl_path:
+                self.write_jsonl(self.jsonl_path)
+
+    def _on_usage(self, event):
+        # Usage events carry running totals; count only what is new
+        with self._lock:
+            for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                delta = event.get(field, 0) - self._usage_seen.get(field, 0)
+                self._usage_seen[field] = event.get(field, 0)
+                if delta > 0 and field != "total_tokens":
+                    TOKENS.inc(delta, kind=field.replace("_tokens", ""), source=event.get("source", ""))
+            self.tokens = dict(self._usage_seen)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "started_at": self.started_at,
+                "stage_seconds": dict(self.stages),
+                "render_step_seconds": {name: round(seconds, 3) for name, seconds in self.steps.items()},
+                "tool_calls": dict(self.tool_calls),
+                "tool_seconds": round(self.tool_seconds, 3),
+                "rate_limit_waits": self.rate_limit_waits,
+                "rate_limit_seconds": round(self.rate_limit_seconds, 3),
+                "tokens": dict(self.tokens)
+            }
+
+    def write_jsonl(self, path):
+        line = json.dumps(self.summary())
+        with _jsonl_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_jsonl_lock = threading.Lock()
+
+
+def format_summary(summary):
+    """Human readable lines describing a RunMetrics summary"""
+    lines = []
+    for stage, seconds in summary["stage_seconds"].items():
+        lines.append(f"{stage}: {seconds:.2f}s")
+    if summary["render_step_seconds"]:
+        steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary["render_step_seconds"].items())
+        lines.append(f"render steps: {steps}")
+    calls = summary["tool_calls"]
+    total_calls = sum(calls.values())
+    if total_calls:
+        lines.append(
+            f"search calls: {total_calls} ({calls['cached']} cached, {calls['failed']} failed), "
+            f"{summary['tool_seconds']:.2f}s total"
+        )
+    if summary.get("rate_limit_waits"):
+        lines.append(f"rate limit: {summary['rate_limit_waits']} calls waited, {summary['rate_limit_seconds']:.2f}s total")
+    if summary["tokens"]:
+        tokens = summary["tokens"]
+        lines.append(
+            f"tokens: {tokens.get('total_tokens', 0)} "
+            f"({tokens.get('prompt_tokens', 0)} prompt, {tokens.get('completion_tokens', 0)} completion)"
+        )
+    return lines
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serve the registry at http://host:port/metrics from a daemon thread"""
+    # Imported here so processes that never serve metrics don't pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = REGISTRY.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,126 @@
+import re
+
+from utils.slide_model import Bullet, Slide
+
+# One compiled pattern classifies each line (header, notes or bullet) with a single match
+LINE = re.compile(
+    r"""^(?P<indent>[ \t]*)(?:
+        (?:\#{1,6}\s*)?slide\s*\d+\s*[:.)\-–—]\s*(?P<title>.*)
+      | (?:speaker\s+)?notes?\s*:\s*(?P<notes>.*)
+      | (?:[-*•+]|\d{1,3}[.)])\s+(?P<bullet>.*)
+    )$""",
+    re.IGNORECASE | re.VERBOSE
+)
+BOLD = re.compile(r"\*\*|__")
+
+MAX_LEVEL = 4
+TAB_WIDTH = 4
+
+
+class OutlineParser:
+    """Incremental parser for "Slide N: Title" outlines.
+
+    Feed it lines one at a time (or a whole file object) and it yields each
+    Slide as soon as the next header closes it. Understands ``-``, ``*``,
+    ``•``, ``+`` and numbered bullets, nesting by indentation, and
+    ``Notes:`` / ``Speaker notes:`` sections.
+    """
+
+    def __init__(self):
+        self._title = None
+        self._bullets = []
+        self._notes = []
+        self._in_notes = False
+        self._indents = []
+
+    def feed(self, line):
+        """Consume one line, returning the slide it completed (if any)"""
+        if "**" in line or "__" in line:
+            line = BOLD.sub("", line)
+        line = line.rstrip()
+        if not line:
+            return None
+
+        match = LINE.match(line)
+        kind = match.lastgroup if match else None
+        if kind == "title":
+            finished = self._finish()
+            self._title = match.group("title").strip() or None
+            return finished
+
+        if self._title is None:
+            # Preamble before the first slide header
+            return None
+
+        if kind == "notes":
+            self._in_notes = True
+            notes = match.group("notes").strip()
+            if notes:
+                self._notes.append(notes)
+        elif self._in_notes:
+            self._notes.append(line.strip().lstrip("-*•+ "))
+        elif kind == "bullet":
+            text = match.group("bullet").strip()
+            if text:
+                self._bullets.append(Bullet(text, self._level(match.group("indent"))))
+        return None
+
+    def _level(self, indent):
+        # Indentation → nesting depth, tolerant of 2-, 3- or 4-space and tab indents
+        if not indent:
+            self._indents = [0]
+            return 0
+        width = len(indent.expandtabs(TAB_WIDTH))
+        while self._indents and self._indents[-1] > width:
+            self._indents.pop()
+        if not self._indents or self._indents[-1] < width:
+            self._indents.append(width)
+        return min(len(self._indents) - 1, MAX_LEVEL)
+
+    def _finish(self):
+        if self._title is None:
+            return None
+        # Parser output is already normalized, so skip re-validating every bullet
+        slide = Slide.model_construct(title=self._title, bullets=self._bullets, notes="\n".join(self._notes))
+        self._title = None
+        self._bullets = []
+        self._notes = []
+        self._in_notes = False
+        self._indents = []
+        return slide
+
+    def close(self):
+        """Flush the final slide, even if it has no bullets"""
+        return self._finish()
+
+    def parse(self, lines):
+        """Yield a Slide for every slide in an iterable of lines"""
+        for line in lines:
+            slide = self.feed(line)
+            if slide is not None:
+                yield slide
+        slide = self.close()
+        if slide is not None:
+            yield slide
+
+
+def iter_slides(lines):
+    """Stream slides out of an iterable of lines, e.g. an open file"""
+    return OutlineParser().parse(lines)
+
+
+def parse_outline(text):
+    """Parse a whole outline string into a list of Slides"""
+    return list(iter_slides(text.splitlines()))
+
+
+def format_outline(slides):
+    """Write Slides back out in the "Slide N: Title" format parse_outline reads"""
+    lines = []
+    for number, slide in enumerate(slides, 1):
+        lines.append(f"Slide {number}: {slide.title}")
+        lines.extend(f"{' ' * TAB_WIDTH * bullet.level}- {bullet.text}" for bullet in slide.bullets)
+        if slide.notes:
+            lines.append(f"Notes: {slide.notes}")
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,369 @@
+import os
+import uuid
+from functools import lru_cache
+
+from utils import events, query_dedup
+from utils.checkpoint import RunCheckpoint, prompt_hash
+from utils.compaction import compact, estimate_tokens
+from utils.config_loader import Config
+
+# crewai, the agents and tasks, and python-pptx are imported where they are first
+# needed, so config checks, checkpoint lookups and re-renders don't pay for them
+
+# Pipeline stages in execution order, used for progress reporting
+STAGES = ["research", "organize", "generate", "render"]
+
+# "agent": one researcher agent covers every facet in turn
+# "parallel": one web search per facet, run concurrently, merged into a report
+RESEARCH_MODES = ["agent", "parallel"]
+
+# "full": research -> organize -> generate agents, deck parsed from the generator's text
+# "fast": the organizer writes a JSON slide list that is rendered directly, skipping the generator
+PIPELINE_MODES = ["full", "fast"]
+
+# Deck structures a variant can ask the organizer for (tasks.organize_task.STRUCTURES)
+DECK_STRUCTURES = ["standard", "executive", "deep_dive"]
+MAX_VARIANT_SLIDES = 30
+
+# Modules whose source makes up each stage's prompts; editing one invalidates that stage's checkpoint and the later ones
+STAGE_PROMPT_MODULES = {
+    "research": ["agents.researcher", "tasks.research_task"],
+    "organize": ["agents.content_organizer", "tasks.organize_task"],
+    "generate": ["agents.ppt_generator", "tasks.generation_task"]
+}
+
+@lru_cache(maxsize=None)
+def get_prompt_hashes():
+    """Prompt hash per stage, each chained onto the hashes of the stages before it"""
+    hashes = {}
+    parent = ""
+    for stage, modules in STAGE_PROMPT_MODULES.items():
+        parent = hashes[stage] = prompt_hash(*modules, parent=parent)
+    return hashes
+
+def preload():
+    """Import the LLM stack (crewai, agents, tasks) ahead of the first run, e.g. from a background thread"""
+    import crewai
+    import tasks.generation_task
+    import tasks.organize_task
+    import tasks.research_task
+    import utils.registry
+
+def get_checkpoint(topic, research_mode=None, pipeline_mode=None, variant=None):
+    """Checkpoint directory for a topic under the current prompts and settings (and deck variant, if any)"""
+    research_mode = research_mode or Config.RESEARCH_MODE
+    if research_mode not in RESEARCH_MODES:
+        raise ValueError(f"Unknown research mode {research_mode!r}, expected one of {RESEARCH_MODES}")
+    pipeline_mode = pipeline_mode or Config.PIPELINE_MODE
+    if pipeline_mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode {pipeline_mode!r}, expected one of {PIPELINE_MODES}")
+    settings = {
+        "research_mode": research_mode,
+        "pipeline_mode": pipeline_mode,
+        "token_budgets": stage_token_budgets()
+    }
+    if variant:
+        settings["variant"] = variant
+    return RunCheckpoint(topic, get_prompt_hashes(), settings)
+
+def parse_variant(spec):
+    """Parse a "structure[:slides]" deck variant, e.g. "executive:4", into ``(name, settings)``"""
+    structure, _, slides = spec.strip().partition(":")
+    if structure not in DECK_STRUCTURES:
+        raise ValueError(f"Unknown deck structure {structure!r}, expected one of {DECK_STRUCTURES}")
+    settings = {"structure": structure}
+    if not slides:
+        return structure, settings
+    if not slides.isdigit() or not 1 <= int(slides) <= MAX_VARIANT_SLIDES:
+        raise ValueError(f"Slide count must be a number from 1 to {MAX_VARIANT_SLIDES}, got {slides!r}")
+    settings["slides"] = int(slides)
+    return f"{structure}-{slides}", settings
+
+def parse_variants(specs):
+    """Parse several variant specs into ``{name: settings}``, in order; naming the same variant twice is an error"""
+    variants = {}
+    for spec in specs:
+        name, settings = parse_variant(spec)
+        if name in variants:
+            raise ValueError(f"Variant {name!r} is listed more than once")
+        variants[name] = settings
+    return variants
+
+def stage_token_budgets():
+    """Token budget for each stage's input; stages without one get the previous output unchanged"""
+    return {"organize": Config.ORGANIZE_TOKEN_BUDGET, "generate": Config.GENERATE_TOKEN_BUDGET}
+
+def compact_context(stage, topic, context):
+    """Fit a stage's input into its token budget, emitting the token counts before and after"""
+    budget = stage_token_budgets().get(stage)
+    if not budget or not context:
+        return context
+    compacted = compact(context, budget, topic)
+    stream = events.current()
+    if stream is not None:
+        stream.emit("context_compacted", stage=stage, budget=budget,
+                    tokens_before=estimate_tokens(context), tokens_after=estimate_tokens(compacted))
+    return compacted
+
+def run_task(task, verbose=True):
+    """Kick off a single-task crew and return its output as text"""
+    from crewai import Crew, Process
+    from utils.registry import get_llm
+    
+    crew = Crew(
+        agents=[task.agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=verbose,
+        llm=get_llm()
+    )
+    stream = events.current()
+    if stream is None:
+        return str(crew.kickoff())
+    with events.attach_agent(task.agent, stream):
+        return str(crew.kickoff())
+
+def run_stage(stage, topic, previous_output, verbose=True, research_mode="agent", pipeline_mode="full", variant=None):
+    """Run one LLM stage given the previous stage's output; ``variant`` holds the organizer's deck settings"""
+    from tasks.generation_task import create_generation_task
+    from tasks.organize_task import create_organization_task
+    from tasks.research_task import create_research_task, run_parallel_research
+    from utils.slide_model import parse_outline_json
+    
+    previous_output = compact_context(stage, topic, previous_output)
+    if stage == "research":
+        if research_mode == "parallel":
+            return run_parallel_research(topic)
+        return run_task(create_research_task(topic), verbose)
+    if stage == "organize":
+        structured = pipeline_mode == "fast"
+        output = run_task(create_organization_task(topic, previous_output, structured=structured, **(variant or {})), verbose)
+        if structured:
+            # Fail here, before checkpointing, rather than rendering an empty deck later
+            parse_outline_json(output)
+        return output
+    if stage == "generate":
+        return run_task(create_generation_task(topic, previous_output, follow_outline=bool(variant)), verbose)
+    raise ValueError(f"Unknown stage {stage!r}")
+
+def generate_outline(topic, verbose=True, on_stage=None, research_mode=None, pipeline_mode=None,
+                     resume=True, event_stream=None, variant=None, until=None, research=None):
+    """Run the LLM stages and return the final outline.
+
+    Each stage's output is checkpointed; with ``resume`` a re-run skips every
+    stage already completed for the same topic, prompts and settings.
+    ``on_stage`` is called with each stage name from STAGES as it starts, and
+    stage, tool, token and usage events are emitted to ``event_stream``.
+    ``variant`` holds organizer settings for one deck variant (see
+    parse_variant); variants reuse the research of the plain run. With
+    ``until`` the run stops after that stage and returns its output.
+    ``research`` is research output already produced for this topic, used
+    in place of the research stage even when not resuming.
+    """
+    checkpoint = get_checkpoint(topic, research_mode, pipeline_mode, variant)
+    research_mode = checkpoint.settings["research_mode"]
+    pipeline_mode = checkpoint.settings["pipeline_mode"]
+    on_stage = on_stage or (lambda stage: None)
+    
+    stages = STAGES[:-1]
+    if pipeline_mode == "fast":
+        stages = [stage for stage in stages if stage != "generate"]
+    if until:
+        stages = stages[:stages.index(until) + 1]
+    
+    stream = event_stream or events.EventStream()
+    
+    # Near-duplicate searches are only shared within a run; a caller may pass one in to read its stats
+    index = query_dedup.get_query_index() or query_dedup.new_query_index()
+    
+    output = None
+    with events.use(stream), query_dedup.use(index):
+        for stage in stages:
+            on_stage(stage)
+            saved = checkpoint.load(stage) if resume else None
+            if stage == "research" and research is not None:
+                saved = research
+            elif saved is None and resume and variant and stage == "research":
+                saved = get_checkpoint(topic, research_mode, pipeline_mode).load(stage)
+            source = output
+            # A hand-edited earlier stage makes the saved output of later ones out of date
+            if saved is not None and checkpoint.is_stale(stage, source):
+                previous, saved = saved, None
+            else:
+                previous = None
+            with stream.stage(stage, cached=saved is not None):
+                if saved is not None:
+                    output = saved
+                    continue
+                output = None
+                if previous is not None and stage == "generate":
+                    output = regenerate_changed_slides(topic, checkpoint.load_input(stage), source, previous, verbose)
+                if output is None:
+                    output = run_stage(stage, topic, source, verbose, research_mode, pipeline_mode, variant)
+                checkpoint.save(stage, output, source=source)
+    
+    if until is None:
+        on_stage(STAGES[-1])
+    return output
+
+def generate_variants(topic, variants, filename, output_dir="output", verbose=False, on_stage=None,
+                      research_mode=None, pipeline_mode=None, resume=True, subscribers=(), max_workers=None):
+    """Research ``topic`` once, then organize and render every deck variant concurrently from that research.
+
+    ``variants`` maps names to organizer settings (see parse_variant) and
+    each deck is written to ``<output_dir>/<filename>_<name>.pptx``. Every
+    run gets its own EventStream, with run ID ``<batch id>-<name>`` (the
+    research run is named "research") and ``subscribers`` attached. Returns
+    ``(name, output_path, error)`` for each variant, in order. ``on_stage``
+    gets the stage of the variant furthest behind, so it only moves forward.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    
+    batch_id = uuid.uuid4().hex[:8]
+    on_stage = on_stage or (lambda stage: None)
+    
+    def new_stream(name):
+        stream = events.EventStream(run_id=f"{batch_id}-{name}")
+        for callback in subscribers:
+            stream.subscribe(callback)
+        return stream
+    
+    research = generate_outline(topic, verbose, on_stage, research_mode, pipeline_mode, resume,
+                                event_stream=new_stream("research"), until="research")
+    
+    stages = dict.fromkeys(variants, "research")
+    reported = ["research"]
+    lock = threading.Lock()
+    
+    def advance(name, stage):
+        with lock:
+            stages[name] = stage
+            slowest = min(stages.values(), key=STAGES.index)
+            if slowest != reported[0]:
+                reported[0] = slowest
+                on_stage(slowest)
+    
+    def build(name, variant):
+        stream = new_stream(name)
+        try:
+            # Handed over directly, so the variants share it even when not resuming
+            outline = generate_outline(topic, verbose, lambda stage: advance(name, stage), research_mode, pipeline_mode,
+                                       resume, event_stream=stream, variant=variant, research=research)
+        except BaseException:
+            # A failed variant no longer holds the others' progress back
+            advance(name, STAGES[-1])
+            raise
+        return render_presentation(outline, f"{filename}_{name}", output_dir, event_stream=stream)
+    
+    with ThreadPoolExecutor(max_workers=max_workers or len(variants)) as executor:
+        futures = [(name, executor.submit(build, name, variant)) for name, variant in variants.items()]
+    results = []
+    for name, future in futures:
+        try:
+            results.append((name, future.result(), None))
+        except Exception as e:
+            results.append((name, None, str(e)))
+    return results
+
+def regenerate_changed_slides(topic, previous_source, source, previous_output, verbose=True):
+    """Re-run the generator for only the outline sections that changed since ``previous_output`` was written.
+
+    Returns the updated outline, or None when the edit can't be mapped onto
+    the previous slides and the stage has to run in full.
+    """
+    from tasks.generation_task import create_section_generation_task
+    from utils.incremental import SLIDE_NUMBER, plan_regeneration
+    from utils.outline_parser import format_outline, parse_outline
+    
+    plan = plan_regeneration(previous_source, source, previous_output)
+    if plan is None:
+        return None
+    slides, changed = plan
+    if changed:
+        pending = iter(changed)
+        # The organizer's slide numbers no longer match the deck, so only the title itself is passed on
+        titles = [slide.title if slide is not None else SLIDE_NUMBER.sub("", next(pending).splitlines()[0]).strip("#* ")
+                  for slide in slides]
+        written = parse_outline(run_task(create_section_generation_task(topic, changed, titles), verbose))
+        if len(written) != len(changed):
+            return None
+        written = iter(written)
+        slides = [slide if slide is not None else next(written) for slide in slides]
+    
+    stream = events.current()
+    if stream:
+        stream.emit("slides_regenerated", stage="generate", reused=len(slides) - len(changed), regenerated=len(changed))
+    return format_outline(slides)
+
+def build_formatter(outline, event_stream=None):
+    """Parse an outline (JSON slide list or text) into a ready-to-save PowerPointFormatter"""
+    from utils.ppt_formatter import PowerPointFormatter, parse_slides
+    
+    stream = event_stream or events.EventStream()
+    with stream.step("parse"):
+        slides = parse_slides(outline)
+    with stream.step("build", slides=len(slides)):
+        formatter = PowerPointFormatter()
+        formatter.render_slides(slides)
+    return formatter
+
+def render_deck(outline, event_stream=None, buffer=None):
+    """Render an outline straight into an in-memory (or caller-supplied) buffer"""
+    stream = event_stream or events.EventStream()
+    with stream.stage("render"):
+        formatter = build_formatter(outline, stream)
+        with stream.step("save"):
+            return formatter.save_to_buffer(buffer)
+
+def render_presentation(outline, filename, output_dir="output", event_stream=None):
+    """Render an outline to a .pptx file and return its path.
+
+    The slides are recorded next to the deck, so ``update_presentation`` can
+    later re-render only the ones that change.
+    """
+    from utils.incremental import save_slide_model
+    
+    stream = event_stream or events.EventStream()
+    with stream.stage("render"):
+        formatter = build_formatter(outline, stream)
+        with stream.step("save"):
+            path = formatter.save_presentation(filename, output_dir)
+            save_slide_model(path, formatter.slides)
+            return path
+
+def update_presentation(outline, filename, output_dir="output", event_stream=None):
+    """Bring an existing deck in line with ``outline``, re-rendering only the slides that changed.
+
+    Unchanged slides are reused as they are; the deck is rendered from
+    scratch when it doesn't exist yet or wasn't rendered by
+    ``render_presentation``. Returns the deck's path.
+    """
+    from utils.incremental import load_slide_model, match_slides, save_slide_model, slide_key
+    from utils.ppt_formatter import PowerPointFormatter, parse_slides
+    
+    stream = event_stream or events.EventStream()
+    deck_path = os.path.join(output_dir, f"{filename}.pptx")
+    previous = load_slide_model(deck_path) if os.path.exists(deck_path) else None
+    if previous is None:
+        return render_presentation(outline, filename, output_dir, stream)
+    
+    with stream.stage("render"):
+        with stream.step("parse"):
+            slides = parse_slides(outline)
+        formatter = PowerPointFormatter(deck_path=deck_path)
+        if len(formatter.prs.slides) != len(previous):
+            # The deck was edited outside this tool; its slides no longer match the record
+            reuse = [None] * len(slides)
+            formatter = PowerPointFormatter()
+        else:
+            reuse = match_slides([slide_key(slide) for slide in previous], [slide_key(slide) for slide in slides])
+        rendered = reuse.count(None)
+        with stream.step("build", slides=rendered):
+            formatter.update_slides(slides, reuse)
+        with stream.step("save"):
+            path = formatter.save_presentation(filename, output_dir)
+            save_slide_model(path, slides)
+        stream.emit("deck_updated", slides=len(slides), reused=len(slides) - rendered, rendered=rendered,
+                    removed=len(previous) - (len(slides) - rendered))
+    return path
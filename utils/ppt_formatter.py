@@ -1,124 +1,222 @@
+import pptx
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.slide import SlidePart
+from copy import deepcopy
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+from utils.config_loader import Config
+from utils.outline_parser import parse_outline
+from utils.slide_model import parse_outline_json
 import os
 import re
+import tempfile
+
+# Smaller than the template defaults for readability
+TITLE_SLIDE_TITLE_SIZE = Pt(32)
+SUBTITLE_SIZE = Pt(18)
+CONTENT_TITLE_SIZE = Pt(24)
+CONTENT_SIZE = Pt(14)
+CONTENT_SPACE_AFTER = Pt(12)
+
+# Characters XML 1.0 can't hold; LLM output occasionally contains them
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+@lru_cache(maxsize=8)
+def load_template(path=None):
+    """Read a .pptx template (python-pptx's default when ``path`` is None) once per process"""
+    if path is None:
+        path = os.path.join(os.path.dirname(pptx.__file__), "templates", "default.pptx")
+    with open(path, "rb") as f:
+        return f.read()
+
+def _paragraphs_xml(items, size, space_after=None):
+    """Build the <a:txBody> XML for (text, level) items in one go"""
+    size_attr = f' sz="{int(size.pt * 100)}"'
+    spacing = f'<a:spcAft><a:spcPts val="{int(space_after.pt * 100)}"/></a:spcAft>' if space_after else ""
+    paragraphs = "".join(
+        f'<a:p><a:pPr lvl="{level}">{spacing}</a:pPr>'
+        f'<a:r><a:rPr lang="en-US"{size_attr} dirty="0"/><a:t>{escape(_INVALID_XML_CHARS.sub("", text))}</a:t></a:r></a:p>'
+        for text, level in items
+    ) or "<a:p/>"  # a text body must hold at least one paragraph
+    return f"<a:txBody {nsdecls('a')}>{paragraphs}</a:txBody>"
+
+def write_text(shape, items, size, space_after=None):
+    """Replace a shape's paragraphs with ``items`` in a single pass.
+
+    Instead of setting ``.text``, clearing the frame and then adding and styling
+    paragraphs one property at a time, the new paragraphs are built as one XML
+    fragment and swapped in.
+    """
+    tx_body = shape.text_frame._txBody
+    for p in tx_body.p_lst:
+        tx_body.remove(p)
+    for p in list(parse_xml(_paragraphs_xml(items, size, space_after))):
+        tx_body.append(p)
+
+def parse_slides(outline):
+    """Parse an outline into Slide models.
+
+    Accepts the organizer's JSON slide list, falling back to the
+    "Slide N: Title" text format (see utils.outline_parser).
+    """
+    try:
+        return parse_outline_json(outline).slides
+    except ValueError:
+        pass
+    
+    return parse_outline(outline)
 
 class PowerPointFormatter:
-    def __init__(self):
-        self.prs = Presentation()
+    def __init__(self, template_path=None, deck_path=None):
+        """Start a new deck from the template, or edit the existing .pptx at ``deck_path``"""
+        if deck_path:
+            self.prs = Presentation(deck_path)
+        else:
+            self.prs = Presentation(BytesIO(load_template(template_path or Config.PPTX_TEMPLATE)))
+        # Layouts are looked up once per deck rather than once per slide
+        self.title_layout = self.prs.slide_layouts[0]  # Title slide layout
+        self.content_layout = self.prs.slide_layouts[1]  # Title and content layout
+        self._placeholder_cache = {}
+        # The Slide models the deck was rendered from, once render_slides or update_slides has run
+        self.slides = []
+        slide_ids = [int(sld_id.get("id")) for sld_id in self.prs.slides._sldIdLst]
+        self._next_slide_id = max(slide_ids + [255]) + 1
+    
+    def add_slide(self, layout):
+        """Append a slide using ``layout``.
+
+        python-pptx's ``slides.add_slide`` rescans every existing relationship
+        and slide ID and re-clones the layout's placeholders for each new slide,
+        which makes large decks quadratic. The first slide of each layout goes
+        through it; later ones reuse copies of that slide's placeholders and
+        append the relationship and slide ID directly.
+        """
+        cached = self._placeholder_cache.get(id(layout))
+        if cached is None:
+            slide = self.prs.slides.add_slide(layout)
+            self._placeholder_cache[id(layout)] = [deepcopy(sp) for sp in slide.shapes._spTree.iter_shape_elms()]
+            self._next_slide_id = max(self._next_slide_id, int(self.prs.slides._sldIdLst[-1].get("id")) + 1)
+            return slide
         
-    def create_title_slide(self, title, subtitle=None):
-        slide_layout = self.prs.slide_layouts[0]  # Title slide layout
-        slide = self.prs.slides.add_slide(slide_layout)
+        prs_part = self.prs.part
+        slide_part = SlidePart.new(prs_part._next_slide_partname, prs_part.package, layout.part)
+        rId = prs_part._rels._add_relationship(RT.SLIDE, slide_part)
+        self.prs.slides._sldIdLst._add_sldId(id=self._next_slide_id, rId=rId)
+        self._next_slide_id += 1
         
-        title_shape = slide.shapes.title
-        title_shape.text = title
+        sp_tree = slide_part.slide.shapes._spTree
+        for sp in cached:
+            sp_tree.append(deepcopy(sp))
+        return slide_part.slide
         
-        # Set smaller font size for title
-        title_frame = title_shape.text_frame
-        title_frame.clear()
-        title_para = title_frame.add_paragraph()
-        title_para.text = title
-        title_para.font.size = Pt(32)  # Smaller title font size
+    def create_title_slide(self, title, subtitle=None):
+        slide = self.add_slide(self.title_layout)
+        write_text(slide.shapes.title, [(title, 0)], TITLE_SLIDE_TITLE_SIZE)
         
         if subtitle:
-            subtitle_shape = slide.placeholders[1]
-            subtitle_shape.text = subtitle
-            
-            # Set smaller font size for subtitle
-            subtitle_frame = subtitle_shape.text_frame
-            subtitle_frame.clear()
-            subtitle_para = subtitle_frame.add_paragraph()
-            subtitle_para.text = subtitle
-            subtitle_para.font.size = Pt(18)  # Smaller subtitle font size
+            write_text(slide.placeholders[1], [(subtitle, 0)], SUBTITLE_SIZE)
             
         return slide
     
-    def create_content_slide(self, title, content_points):
-        slide_layout = self.prs.slide_layouts[1]  # Title and content layout
-        slide = self.prs.slides.add_slide(slide_layout)
+    def create_content_slide(self, title, content_points, notes=None):
+        """Add a bulleted slide; points are strings or Bullet models (for nested levels)"""
+        slide = self.add_slide(self.content_layout)
+        write_text(slide.shapes.title, [(title, 0)], CONTENT_TITLE_SIZE)
         
-        title_shape = slide.shapes.title
-        title_shape.text = title
+        items = [(point, 0) if isinstance(point, str) else (point.text, point.level) for point in content_points]
+        write_text(slide.placeholders[1], items, CONTENT_SIZE, CONTENT_SPACE_AFTER)
         
-        # Set smaller font size for slide title
-        title_frame = title_shape.text_frame
-        title_frame.clear()
-        title_para = title_frame.add_paragraph()
-        title_para.text = title
-        title_para.font.size = Pt(24)  # Smaller slide title font size
-        
-        content_shape = slide.placeholders[1]
-        tf = content_shape.text_frame
-        tf.text = ""  # Clear default text
-        
-        for point in content_points:
-            p = tf.add_paragraph()
-            p.text = point
-            p.level = 0
-            p.space_after = Pt(12)
-            p.font.size = Pt(14)  # Smaller content font size
+        if notes:
+            slide.notes_slide.notes_text_frame.text = notes
             
         return slide
     
+    def save_to_buffer(self, buffer=None):
+        """Write the deck to a file-like object (a new BytesIO by default), rewound for reading.
+
+        Pass a ``tempfile.SpooledTemporaryFile`` to keep small decks in memory
+        and spill large ones to disk.
+        """
+        buffer = buffer if buffer is not None else BytesIO()
+        self.prs.save(buffer)
+        buffer.seek(0)
+        return buffer
+    
     def save_presentation(self, filename, output_dir="output"):
         if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+            os.makedirs(output_dir, exist_ok=True)
         
         filepath = os.path.join(output_dir, f"{filename}.pptx")
-        self.prs.save(filepath)
+        # Save to a temp file and rename it into place, so a concurrent reader
+        # or writer of the same filename never sees a half-written deck
+        fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".pptx.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.prs.save(f)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
         return filepath
     
-    def format_content_from_outline(self, outline):
-        # Parse the structured outline and create slides
-        # This is a simplified implementation - you might need to adjust based on your actual outline format
-        text = re.sub(r"\*\*", "", outline).strip()
-        
-        lines = text.split("\n")
+    def parse_outline(self, outline):
+        return parse_slides(outline)
+    
+    def render_slide(self, index, slide):
+        """Append one Slide model; index 0 is rendered as the title slide"""
+        if index == 0:
+            subtitle = slide.bullets[0].text if slide.bullets else ""
+            return self.create_title_slide(slide.title, subtitle)
+        return self.create_content_slide(slide.title, slide.bullets, slide.notes)
+    
+    def render_slides(self, slides):
+        """Add one slide per Slide model; the first becomes the title slide"""
+        for i, slide in enumerate(slides):
+            self.render_slide(i, slide)
         
-        slides_data = []
-        current_slide_title = None
-        current_points = []
+        self.slides = list(slides)
+        return self
+    
+    def update_slides(self, slides, reuse):
+        """Make an existing deck show ``slides``, rendering only the ones that changed.
 
-        for line in lines:
-            line = line.strip()
-            
-            # Detect slide titles like "Slide 1: Title" or "Slide 2: ..."
-            if re.match(r"^Slide\s*\d+:", line, re.IGNORECASE):
-                # Save previous slide if exists
-                if current_slide_title:
-                    slides_data.append({
-                        'title': current_slide_title,
-                        'points': current_points
-                    })
-                # Start new slide
-                current_slide_title = line.split(":", 1)[1].strip()
-                current_points = []
-            
-            # Detect bullets (even nested ones)
-            elif line.startswith("-"):
-                # Remove leading '-' and extra spaces
-                point = line.lstrip("-").strip()
-                if point:
-                    current_points.append(point)
-        
-        # Add last slide
-        if current_slide_title and current_points:
-            slides_data.append({
-                'title': current_slide_title,
-                'points': current_points
-            })
+        ``reuse[i]`` is the index of the deck's current slide that already
+        shows ``slides[i]``, or None if it has to be rendered. Reused slides
+        are only moved, so their XML is left exactly as it was; slides that
+        nothing reuses are removed.
+        """
+        sld_id_lst = self.prs.slides._sldIdLst
+        existing = list(sld_id_lst)
+        if any(old is not None and not 0 <= old < len(existing) for old in reuse):
+            raise ValueError(f"Deck has {len(existing)} slides; cannot reuse {reuse}")
         
-        # Generate slides
-        for i, slide_data in enumerate(slides_data):
-            if i == 0:
-                subtitle = slide_data['points'][0] if slide_data['points'] else ""
-                self.create_title_slide(slide_data['title'], subtitle)
+        order = []
+        for i, (slide, old) in enumerate(zip(slides, reuse)):
+            if old is None:
+                self.render_slide(i, slide)
+                order.append(sld_id_lst[-1])
             else:
-                self.create_content_slide(slide_data['title'], slide_data['points'])
+                order.append(existing[old])
         
-        return self 
+        for sld_id in list(sld_id_lst):
+            sld_id_lst.remove(sld_id)
+        for sld_id in order:
+            sld_id_lst.append(sld_id)
+        kept = {id(sld_id) for sld_id in order}
+        for sld_id in existing:
+            if id(sld_id) not in kept:
+                self.prs.part.drop_rel(sld_id.rId)
+        # Slide part names follow deck order; python-pptx only renumbers them when a deck is opened
+        self.prs.part.rename_slide_parts([sld_id.rId for sld_id in sld_id_lst])
+        self.slides = list(slides)
+        return self
     
-    
\ No newline at end of file
+    def format_content_from_outline(self, outline):
+        return self.render_slides(self.parse_outline(outline))
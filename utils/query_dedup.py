@@ -0,0 +1,222 @@
+import contextvars
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from utils.config_loader import Config
+from utils.search_cache import normalize_query
+
+# Words that change the phrasing of a search but not what it is looking for
+STOPWORDS = frozenset(
+    "a an and are about as at be by can do does for from how in is it its latest me of on or "
+    "please recent search show tell the their this to what when where which who why with".split()
+)
+
+WORD = re.compile(r"[a-z0-9]+")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def query_tokens(query):
+    """Normalized content words of a query, with simple plural folding"""
+    tokens = set()
+    for word in WORD.findall(normalize_query(query)):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.add(word)
+    return frozenset(tokens)
+
+
+def numbers(tokens):
+    return {token for token in tokens if token.isdigit()}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures over token sets, with a fixed seed so they are stable across runs"""
+
+    def __init__(self, num_perm=32, seed=1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            for token in tokens
+        ] or [0]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self.permutations
+        )
+
+
+class _Entry:
+    __slots__ = ("query", "tokens", "bands", "future", "created_at")
+
+    def __init__(self, query, tokens, bands):
+        self.query = query
+        self.tokens = tokens
+        self.bands = bands
+        self.future = Future()
+        self.created_at = time.monotonic()
+
+
+class QueryIndex:
+    """In-memory index of recent search queries for near-duplicate detection.
+
+    Queries are reduced to content-word sets; MinHash signatures split into
+    LSH bands find candidates cheaply, and a candidate is a duplicate when the
+    exact Jaccard similarity of the token sets reaches ``threshold`` and both
+    mention the same numbers. Each entry holds a future, so a duplicate of a
+    query still in flight waits for that request instead of sending its own.
+    """
+
+    def __init__(self, threshold=0.75, window=900, max_entries=256, num_perm=32, bands=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.window = window
+        self.max_entries = max_entries
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.hits = 0
+        self.joins = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bands(self, tokens):
+        signature = self.hasher.signature(tokens)
+        return [
+            (i, signature[i * self.rows:(i + 1) * self.rows])
+            for i in range(len(signature) // self.rows)
+        ]
+
+    def claim(self, query):
+        """Find a near-duplicate of ``query`` or register it as a new request.
+
+        Returns ``(entry, leader)``. A leader must call ``resolve`` or
+        ``discard`` with the entry once its search finishes; anyone else
+        waits on ``entry.future`` for the earlier answer.
+        """
+        tokens = query_tokens(query)
+        bands = self._bands(tokens)
+        with self._lock:
+            self._expire()
+            best, best_score = None, 0.0
+            wanted_numbers = numbers(tokens)
+            for band in bands:
+                for entry in self._buckets.get(band, ()):
+                    # "2023 trends" and "2024 trends" look alike but ask different questions
+                    if numbers(entry.tokens) != wanted_numbers:
+                        continue
+                    score = jaccard(tokens, entry.tokens)
+                    if score > best_score:
+                        best, best_score = entry, score
+            if best is not None and best_score >= self.threshold:
+                if best.future.done():
+                    self.hits += 1
+                else:
+                    self.joins += 1
+                self._entries.move_to_end(id(best))
+                return best, False
+
+            self.misses += 1
+            entry = _Entry(query, tokens, bands)
+            self._entries[id(entry)] = entry
+            for band in bands:
+                self._buckets.setdefault(band, []).append(entry)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries.values())))
+            return entry, True
+
+    def resolve(self, entry, value):
+        entry.future.set_result(value)
+
+    def discard(self, entry, error):
+        """Drop a failed search so later duplicates try again; waiting duplicates get ``error``"""
+        with self._lock:
+            self._remove(entry)
+        entry.future.set_exception(error)
+
+    def _remove(self, entry):
+        if self._entries.pop(id(entry), None) is None:
+            return
+        for band in entry.bands:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.remove(entry)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _expire(self):
+        if not self.window:
+            return
+        cutoff = time.monotonic() - self.window
+        for entry in list(self._entries.values()):
+            # Only finished entries expire; joining a request in flight is always safe
+            if entry.created_at < cutoff and entry.future.done():
+                self._remove(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        lookups = self.hits + self.joins + self.misses
+        return {
+            "hits": self.hits,
+            "joins": self.joins,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "hit_rate": (self.hits + self.joins) / lookups if lookups else 0.0
+        }
+
+
+_current = contextvars.ContextVar("query_index", default=None)
+
+
+def new_query_index():
+    """A query index configured from Config, or None when deduplication is disabled"""
+    if not Config.SEARCH_DEDUP_THRESHOLD:
+        return None
+    return QueryIndex(
+        threshold=Config.SEARCH_DEDUP_THRESHOLD,
+        window=Config.SEARCH_DEDUP_WINDOW,
+        max_entries=Config.SEARCH_DEDUP_MAX_ENTRIES
+    )
+
+
+def get_query_index():
+    """The query index of the run executing in this context, or None outside a run or when disabled.
+
+    Each run has its own index: concurrent runs on similar topics must not
+    answer each other's searches.
+    """
+    return _current.get()
+
+
+@contextmanager
+def use(index):
+    token = _current.set(index)
+    try:
+        yield index
+    finally:
+        _current.reset(token)
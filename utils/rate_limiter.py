@@ -0,0 +1,242 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils import events
+from utils.compaction import estimate_tokens
+from utils.config_loader import Config
+from utils.metrics import REGISTRY
+
+RATE_LIMIT_WAIT = REGISTRY.histogram("ppt_rate_limit_wait_seconds", "Time Perplexity calls waited for the client-side rate limiter")
+RATE_LIMIT_CALLS = REGISTRY.counter("ppt_rate_limit_calls_total", "Perplexity calls admitted by the rate limiter, by whether they had to wait")
+RATE_LIMIT_REJECTIONS = REGISTRY.counter("ppt_rate_limit_429_total", "429 responses reported back to the rate limiter")
+
+# Completion length assumed for a call before its real usage is known
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class RateLimiter:
+    """Token buckets for requests and tokens per minute, shared by every caller.
+
+    Each bucket holds ``burst`` seconds' worth of its per-minute rate and
+    refills continuously. Callers wait in FIFO order, so a large call is not
+    starved by a stream of small ones. Token costs are estimated up front
+    and corrected with ``settle`` once the real usage is known; the bucket
+    may go into debt, which later callers pay off by waiting.
+
+    With ``path`` set the bucket levels live in a SQLite file, so every
+    process pointed at it draws from the same budget.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, burst=10, path=None):
+        self.rates = {}
+        if requests_per_minute:
+            self.rates["requests"] = requests_per_minute / 60
+        if tokens_per_minute:
+            self.rates["tokens"] = tokens_per_minute / 60
+        # At least one request's worth, or a bucket could never admit anything
+        self.capacity = {name: max(rate * burst, 1) for name, rate in self.rates.items()}
+        self.store = _SqliteStore(path, self.capacity) if path else _MemoryStore(self.capacity)
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._queue = deque()
+        self._lock = threading.Condition()
+
+    @property
+    def enabled(self):
+        return bool(self.rates)
+
+    def acquire(self, tokens=0, kind="llm"):
+        """Block until one request costing ``tokens`` fits the budget; return the seconds waited"""
+        if not self.enabled:
+            return 0.0
+        costs = {"requests": 1, "tokens": tokens}
+        costs = {name: cost for name, cost in costs.items() if name in self.rates}
+        started = time.perf_counter()
+        ticket = object()
+        with self._lock:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] is ticket:
+                        delay = self.store.take(costs, self.rates)
+                        if delay == 0:
+                            break
+                    else:
+                        delay = None
+                    # The head of the queue sleeps until its deficit refills; everyone else until it leaves
+                    self._lock.wait(delay)
+            finally:
+                self._queue.remove(ticket)
+                self._lock.notify_all()
+
+        waited = time.perf_counter() - started
+        RATE_LIMIT_WAIT.observe(waited, kind=kind)
+        RATE_LIMIT_CALLS.inc(kind=kind, waited="true" if waited >= 0.01 else "false")
+        if waited >= 0.01:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += waited
+            stream = events.current()
+            if stream:
+                stream.emit("rate_limit_wait", kind=kind, seconds=round(waited, 3))
+        return waited
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once a call's real token usage is known"""
+        if "tokens" in self.rates and actual is not None and actual != estimated:
+            self.store.adjust("tokens", estimated - actual, self.rates)
+
+    def penalize(self, seconds, kind="llm"):
+        """Stop admitting requests for ``seconds`` after the API answered 429"""
+        RATE_LIMIT_REJECTIONS.inc(kind=kind)
+        if "requests" in self.rates and seconds:
+            self.store.drain("requests", -seconds * self.rates["requests"], self.rates)
+
+    def stats(self):
+        with self._lock:
+            return {"waits": self.waits, "wait_seconds": round(self.wait_seconds, 3), "queued": len(self._queue)}
+
+
+def _refill(level, updated_at, now, rate, capacity):
+    return min(capacity, level + max(0.0, now - updated_at) * rate)
+
+
+def _take(levels, costs, rates, capacity):
+    """Subtract ``costs`` from ``levels`` in place if they fit; return 0 or the seconds until they will"""
+    delay = 0.0
+    for name, cost in costs.items():
+        # A call bigger than the whole bucket goes through once the bucket is full
+        needed = min(cost, capacity[name])
+        if levels[name] < needed:
+            delay = max(delay, (needed - levels[name]) / rates[name])
+    if delay:
+        return delay
+    for name, cost in costs.items():
+        levels[name] -= cost
+    return 0.0
+
+
+class _MemoryStore:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        now = time.monotonic()
+        self.levels = dict(capacity)
+        self.updated_at = dict.fromkeys(capacity, now)
+        self._lock = threading.Lock()
+
+    def _refill_all(self, rates):
+        now = time.monotonic()
+        for name, rate in rates.items():
+            self.levels[name] = _refill(self.levels[name], self.updated_at[name], now, rate, self.capacity[name])
+            self.updated_at[name] = now
+
+    def take(self, costs, rates):
+        with self._lock:
+            self._refill_all(rates)
+            return _take(self.levels, costs, rates, self.capacity)
+
+    # Every change refills the buckets up to now first; otherwise the next refill would
+    # credit the idle time since the last update on top of the change and cancel it out
+    def adjust(self, name, amount, rates):
+        with self._lock:
+            self._refill_all(rates)
+            self.levels[name] = min(self.capacity[name], self.levels[name] + amount)
+
+    def drain(self, name, level, rates):
+        with self._lock:
+            self._refill_all(rates)
+            self.levels[name] = min(self.levels[name], level)
+
+
+class _SqliteStore:
+    """Bucket levels in a SQLite file, updated in IMMEDIATE transactions so processes don't race"""
+
+    def __init__(self, path, capacity):
+        self.path = path
+        self.capacity = capacity
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)")
+            for name, size in capacity.items():
+                conn.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, size, time.time()))
+
+    @contextmanager
+    def _transaction(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _load(self, conn, rates):
+        # Processes share wall-clock time, not monotonic time
+        now = time.time()
+        levels = {}
+        for name, level, updated_at in conn.execute("SELECT name, level, updated_at FROM buckets"):
+            if name in self.capacity:
+                levels[name] = _refill(level, updated_at, now, rates[name], self.capacity[name])
+        return levels, now
+
+    def _store(self, conn, levels, now):
+        conn.executemany("UPDATE buckets SET level = ?, updated_at = ? WHERE name = ?",
+                         [(level, now, name) for name, level in levels.items()])
+
+    def take(self, costs, rates):
+        with self._transaction() as conn:
+            levels, now = self._load(conn, rates)
+            delay = _take(levels, costs, rates, self.capacity)
+            self._store(conn, levels, now)
+        return delay
+
+    def adjust(self, name, amount, rates):
+        with self._transaction() as conn:
+            levels, now = self._load(conn, rates)
+            levels[name] = min(self.capacity[name], levels[name] + amount)
+            self._store(conn, levels, now)
+
+    def drain(self, name, level, rates):
+        with self._transaction() as conn:
+            levels, now = self._load(conn, rates)
+            levels[name] = min(levels[name], level)
+            self._store(conn, levels, now)
+
+
+def estimate_call_tokens(messages, max_tokens=None):
+    """Rough prompt plus completion tokens for a chat call, used until the real usage comes back"""
+    if isinstance(messages, str):
+        text = messages
+    else:
+        text = "".join(str(message.get("content") or "") for message in messages)
+    return estimate_tokens(text) + (DEFAULT_COMPLETION_TOKENS if max_tokens is None else max_tokens)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter shared by the LLM and the search tool"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                requests_per_minute=Config.RATE_LIMIT_RPM,
+                tokens_per_minute=Config.RATE_LIMIT_TPM,
+                burst=Config.RATE_LIMIT_BURST,
+                path=Config.RATE_LIMIT_DB
+            )
+        return _limiter
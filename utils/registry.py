@@ -0,0 +1,27 @@
+import threading
+
+from tools.web_searchtool import WebSearchTool
+from utils.llm_config import get_perplexity_llm
+
+_instances = {}
+_lock = threading.Lock()
+
+def get_shared(name, factory):
+    """Return the process-wide instance registered under ``name``, building it with ``factory`` on first use"""
+    with _lock:
+        if name not in _instances:
+            _instances[name] = factory()
+        return _instances[name]
+
+def get_llm():
+    """The Perplexity LLM client shared by every agent and crew in this process"""
+    return get_shared("llm", get_perplexity_llm)
+
+def get_search_tool():
+    """The web search tool shared by every researcher in this process"""
+    return get_shared("web_search_tool", WebSearchTool)
+
+def reset():
+    """Drop all shared instances, e.g. after changing Config at runtime"""
+    with _lock:
+        _instances.clear()
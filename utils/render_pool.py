@@ -0,0 +1,138 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.config_loader import Config
+from utils.ppt_formatter import PowerPointFormatter, load_template
+
+_start_times = None
+
+def _warm_worker(template_path, start_times):
+    # Runs once per worker process: read the template before the first job arrives
+    global _start_times
+    _start_times = start_times
+    load_template(template_path)
+
+def _noop():
+    return os.getpid()
+
+def _render(job_id, slides, filename, output_dir, template_path):
+    # Tell the parent when the job actually starts, so queueing doesn't count against its timeout
+    _start_times.put((job_id, time.time()))
+    formatter = PowerPointFormatter(template_path).render_slides(slides)
+    if output_dir:
+        return formatter.save_presentation(filename, output_dir)
+    return formatter.save_to_buffer().getvalue()
+
+class RenderPool:
+    """Renders decks from parsed Slide models on a pool of worker processes.
+
+    python-pptx rendering and zip compression are CPU-bound and hold the GIL,
+    so bulk re-renders are spread across processes. Each worker loads the
+    template once when it starts.
+    """
+
+    def __init__(self, workers=None, timeout=None, template_path=None):
+        self.workers = workers or Config.RENDER_WORKERS or os.cpu_count() or 1
+        self.timeout = timeout if timeout is not None else Config.RENDER_TIMEOUT
+        self.template_path = template_path or Config.PPTX_TEMPLATE
+        self._ids = itertools.count()
+        self._started = {}
+        self._start()
+
+    def _start(self):
+        self._start_times = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_warm_worker,
+            initargs=(self.template_path, self._start_times)
+        )
+
+    def _restart(self):
+        """Kill every worker, stuck ones included, and start a fresh pool.
+
+        A process can't be interrupted mid-render, only killed, and killing
+        one breaks the whole executor.
+        """
+        executor, start_times = self._executor, self._start_times
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        start_times.close()
+        self._started.clear()
+        self._start()
+
+    def warm(self):
+        """Start every worker now instead of on the first jobs"""
+        for future in [self._executor.submit(_noop) for _ in range(self.workers)]:
+            future.result()
+        return self
+
+    def submit(self, slides, filename=None, output_dir=None):
+        """Queue one deck; the future resolves to its path (with ``output_dir``) or its .pptx bytes"""
+        return self._submit(next(self._ids), list(slides), filename, output_dir)
+
+    def _submit(self, job_id, slides, filename, output_dir):
+        return self._executor.submit(_render, job_id, slides, filename, output_dir, self.template_path)
+
+    def _collect_start_times(self):
+        while True:
+            try:
+                job_id, started = self._start_times.get_nowait()
+            except queue.Empty:
+                return
+            self._started[job_id] = started
+
+    def _wait(self, job_id, future):
+        # The timeout counts from when a worker picks the job up, not from when it was queued
+        while True:
+            done, _ = wait([future], timeout=0.05)
+            if done:
+                return future.result()
+            self._collect_start_times()
+            started = self._started.get(job_id)
+            if self.timeout and started is not None and time.time() - started > self.timeout:
+                raise FutureTimeoutError()
+
+    def render_many(self, jobs, output_dir=None):
+        """Render ``(filename, slides)`` pairs, yielding ``(filename, result, error)`` in submission order.
+
+        A job that runs past ``timeout`` seconds is reported as failed and
+        the workers are restarted to stop it; later jobs that hadn't finished
+        by then are submitted again.
+        """
+        jobs = [(next(self._ids), filename, list(slides)) for filename, slides in jobs]
+        futures = {job_id: self._submit(job_id, slides, filename, output_dir) for job_id, filename, slides in jobs}
+        for index, (job_id, filename, _) in enumerate(jobs):
+            try:
+                yield filename, self._wait(job_id, futures[job_id]), None
+            except FutureTimeoutError:
+                self._restart()
+                for later_id, later_filename, slides in jobs[index + 1:]:
+                    if not _finished(futures[later_id]):
+                        futures[later_id] = self._submit(later_id, slides, later_filename, output_dir)
+                yield filename, None, f"timed out after {self.timeout}s"
+            except Exception as e:
+                yield filename, None, str(e)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # On an error, don't sit waiting for the decks nobody will collect
+        self.shutdown(wait=exc_type is None)
+
+def _finished(future):
+    """Whether a future has its real outcome, rather than being cancelled or lost with a killed worker"""
+    if not future.done() or future.cancelled():
+        return False
+    return not isinstance(future.exception(), BrokenProcessPool)
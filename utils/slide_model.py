@@ -0,0 +1,62 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Annotated, List
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+# A plain dataclass rather than a BaseModel: outlines can hold tens of thousands
+# of bullets and pydantic still validates it when it's a field of Slide
+@dataclass
+class Bullet:
+    text: str
+    level: Annotated[int, Field(ge=0, le=4)] = 0
+
+class Slide(BaseModel):
+    title: str
+    bullets: List[Bullet] = Field(default_factory=list)
+    notes: str = ""
+
+    @field_validator("title")
+    @classmethod
+    def _title_not_blank(cls, value):
+        value = value.strip()
+        if not value:
+            raise ValueError("slide title must not be empty")
+        return value
+
+    @field_validator("bullets", mode="before")
+    @classmethod
+    def _coerce_bullets(cls, value):
+        # Plain strings are accepted as top-level bullets
+        return [{"text": item} if isinstance(item, str) else item for item in value or []]
+
+class DeckOutline(BaseModel):
+    """Structured presentation outline; the first slide is rendered as the title slide"""
+    slides: List[Slide] = Field(min_length=1)
+
+# Example shown to the organizer so its output can be rendered without another LLM pass
+OUTLINE_JSON_EXAMPLE = """{
+  "slides": [
+    {"title": "Presentation title", "bullets": ["Subtitle"]},
+    {"title": "Overview", "bullets": ["Point one", "Point two"], "notes": "Optional speaker notes"}
+  ]
+}"""
+
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+def parse_outline_json(text):
+    """Validate an LLM's JSON outline (optionally wrapped in a ```json fence) into a DeckOutline.
+
+    Raises ValueError if the text holds no JSON object or it doesn't match the schema.
+    """
+    fenced = _JSON_FENCE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start, end = candidate.find("{"), candidate.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object found in outline")
+    
+    try:
+        return DeckOutline.model_validate(json.loads(candidate[start:end + 1]))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Invalid JSON outline: {e}") from e